@@ -3,7 +3,6 @@ import random
 import math
 import warnings
 from sys import maxsize
-import json
 
 
 """
@@ -16,7 +15,8 @@ Advanced strategy tips:
 
   - The GameState.map object can be manually manipulated to create hypothetical 
   board states. Though, we recommended making a copy of the map to preserve 
-  the actual current map state.
+  the actual current map state. GameState.fork() makes a cheap copy of the
+  whole game state for this.
 """
 
 class AlgoStrategy(gamelib.AlgoCore):
@@ -184,25 +184,23 @@ class AlgoStrategy(gamelib.AlgoCore):
         """
         damages = []
         # Get the damage estimate each path will take
-        for location in location_options:
-            path = game_state.find_path_to_edge(location)
-            damage = 0
-            for path_location in path:
-                # Get number of enemy destructors that can attack the final location and multiply by destructor damage
-                damage += len(game_state.get_attackers(path_location, 0)) * gamelib.GameUnit(DESTRUCTOR, game_state.config).damage
-            damages.append(damage)
+        # find_paths_to_edge shares one search between all locations heading for the same edge
+        paths = game_state.find_paths_to_edge(location_options)
+        for path in paths:
+            # Sum the damage enemy destructors deal each frame along the path, read from the threat map of the game state
+            damages.append(game_state.get_path_damage(path, 0))
         
         # Now just return the location that takes the least damage
         return location_options[damages.index(min(damages))]
 
     def detect_enemy_unit(self, game_state, unit_type=None, valid_x = None, valid_y = None):
-        total_units = 0
-        for location in game_state.game_map:
-            if game_state.contains_stationary_unit(location):
-                for unit in game_state.game_map[location]:
-                    if unit.player_index == 1 and (unit_type is None or unit.unit_type == unit_type) and (valid_x is None or location[0] in valid_x) and (valid_y is None or location[1] in valid_y):
-                        total_units += 1
-        return total_units
+        # Bitboards hold one bit per tile, so we can mask out the rows and columns we care about instead of looping over the map
+        enemy_units = game_state.game_map.get_bitboard(unit_type, 1) & game_state.game_map.walls
+        if valid_x is not None:
+            enemy_units &= gamelib.bitboard.columns_mask(valid_x)
+        if valid_y is not None:
+            enemy_units &= gamelib.bitboard.rows_mask(valid_y)
+        return gamelib.bitboard.count(enemy_units)
         
     def filter_blocked_locations(self, locations, game_state):
         filtered = []
@@ -219,7 +217,7 @@ class AlgoStrategy(gamelib.AlgoCore):
         Full doc on format of a game frame at: https://docs.c1games.com/json-docs.html
         """
         # Let's record at what position we get scored on
-        state = json.loads(turn_string)
+        state = gamelib.load_state(turn_string)
         events = state["events"]
         breaches = events["breach"]
         for breach in breaches:
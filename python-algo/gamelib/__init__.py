@@ -3,10 +3,12 @@ The gamelib package contains modules that assist in algo creation
 """
 
 from .algocore import AlgoCore
-from .util import debug_write
+from .util import debug_write, load_state, GameMessage
 from .game_state import GameState
-from .unit import GameUnit
+from .unit import GameUnit, UnitSpec, compile_unit_specs
 from .game_map import GameMap
+from .live_board import LiveBoard
+from .simulator import ActionSimulator, SimulationResult, BatchSimulator, BatchResult
 
-__all__ = ["algocore", "game_state", "game_map", "navigation", "unit", "util"]
+__all__ = ["algocore", "bitboard", "game_state", "game_map", "live_board", "navigation", "simulator", "unit", "util"]
  
\ No newline at end of file
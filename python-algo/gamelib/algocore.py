@@ -1,15 +1,23 @@
 import json
 
 from .game_state import GameState
-from .util import get_command, debug_write, BANNER_TEXT, send_command
+from .unit import compile_unit_specs
+from .util import get_command, debug_write, BANNER_TEXT, send_command, GameMessage
 
 class AlgoCore(object):
     """This class handles communication with the game itself. Your strategy should subclass it.
 
+    Each message from the game is decoded once. on_turn and on_action_frame are passed a GameMessage, which is the
+    message string with the decoded json attached, so GameState(config, turn_state) does not decode it again.
+
     Attributes:
         * config (JSON): json object containing information about the game
+        * decoded_messages (bool): Pass on_turn and on_action_frame the decoded json as a dict instead of a GameMessage.
+          GameState accepts either
 
     """
+    decoded_messages = False
+
     def __init__(self):
         self.config = None
 
@@ -23,14 +31,16 @@ class AlgoCore(object):
     def on_turn(self, game_state):
         """
         This step function is called every turn and is passed a string containing
-        the current game state, which can be used to initialize a new GameMap
+        the current game state, which can be used to initialize a new GameState.
+        The json is passed already decoded if decoded_messages is set
         """
         self.submit_default_turn()
     
     def on_action_frame(self, turn_string):
         """
         This function is called every action frame and is passed a string containing
-        the current game state, which can also be used to initialize a new GameMap.
+        the current game state, which can also be used to initialize a new GameState.
+        Use load_state to read the json, it has already been decoded.
         Be careful about going over your compute time as this is potentially called hundreds of 
         times per turn
         """
@@ -57,21 +67,24 @@ class AlgoCore(object):
                 This means this must be the config file. So, load in the config file as a json and add it to your AlgoStrategy class.
                 """
                 parsed_config = json.loads(game_state_string)
+                # Compile the unit stats once, every GameState and GameUnit for this config reuses them
+                compile_unit_specs(parsed_config)
                 self.on_game_start(parsed_config)
             elif "turnInfo" in game_state_string:
                 state = json.loads(game_state_string)
+                message = state if self.decoded_messages else GameMessage(game_state_string, state)
                 stateType = int(state.get("turnInfo")[0])
                 if stateType == 0:
                     """
                     This is the game turn game state message. Algo must now print to stdout 2 lines, one for build phase one for
                     deploy phase. Printing is handled by the provided functions.
                     """
-                    self.on_turn(game_state_string)
+                    self.on_turn(message)
                 elif stateType == 1:
                     """
                     If stateType == 1, this game_state_string string represents a single frame of an action phase
                     """
-                    self.on_action_frame(game_state_string)
+                    self.on_action_frame(message)
                 elif stateType == 2:
                     """
                     This is the end game message. This means the game is over so break and finish the program.
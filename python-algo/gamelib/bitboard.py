@@ -0,0 +1,104 @@
+"""
+Helpers for bitboards, Python ints where bit n is set when tile id n holds something.
+
+GameMap keeps a bitboard for each player and unit type, see GameMap.get_bitboard. Questions about sets of
+locations then become a few bitwise operations, for example the number of enemy destructors in the front
+two rows is count(game_map.get_bitboard(DESTRUCTOR, 1) & rows_mask([14, 15])).
+"""
+
+from .geometry import ARENA_SIZE, ARENA_TILES, TILE_ID, TILE_X, TILE_Y, tiles_in_range
+
+ALL_TILES = (1 << ARENA_TILES) - 1
+
+def _build_line_masks(coordinates):
+    masks = [0] * ARENA_SIZE
+    for tile, value in enumerate(coordinates):
+        masks[value] |= 1 << tile
+    return tuple(masks)
+
+#ROW_MASKS[y] and COLUMN_MASKS[x] hold every tile in a row or column of the arena
+ROW_MASKS = _build_line_masks(TILE_Y)
+COLUMN_MASKS = _build_line_masks(TILE_X)
+
+def rows_mask(rows):
+    """A bitboard of every tile in the given rows
+
+    Args:
+        * rows: A list of y coordinates
+
+    """
+    mask = 0
+    for y in rows:
+        if 0 <= y < ARENA_SIZE:
+            mask |= ROW_MASKS[y]
+    return mask
+
+def columns_mask(columns):
+    """A bitboard of every tile in the given columns
+
+    Args:
+        * columns: A list of x coordinates
+
+    """
+    mask = 0
+    for x in columns:
+        if 0 <= x < ARENA_SIZE:
+            mask |= COLUMN_MASKS[x]
+    return mask
+
+#Each player's half of the arena, player 0 owns the bottom half
+HALF_MASKS = (rows_mask(range(ARENA_SIZE // 2)), rows_mask(range(ARENA_SIZE // 2, ARENA_SIZE)))
+
+def location_mask(locations):
+    """A bitboard of a list of locations, ignoring those outside of the arena
+
+    Args:
+        * locations: A list of map locations
+
+    """
+    mask = 0
+    for x, y in locations:
+        if 0 <= x < ARENA_SIZE and 0 <= y < ARENA_SIZE and not TILE_ID[x][y] == -1:
+            mask |= 1 << TILE_ID[x][y]
+    return mask
+
+_RANGE_MASKS = {}
+
+def range_mask(tile, radius):
+    """A bitboard of the tiles in range of a tile, see GameMap.get_locations_in_range
+
+    Args:
+        * tile: The tile id at the center of the search area
+        * radius: The radius of the search area
+
+    """
+    key = (tile, radius)
+    mask = _RANGE_MASKS.get(key)
+    if mask is None:
+        mask = 0
+        for in_range in tiles_in_range(tile, radius):
+            mask |= 1 << in_range
+        _RANGE_MASKS[key] = mask
+    return mask
+
+def tiles(bits):
+    """Yields the tile id of every set bit, lowest first
+    """
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+def locations(bits):
+    """The locations of every set bit
+
+    Returns:
+        A list of [x, y] locations in tile id order
+
+    """
+    return [[TILE_X[tile], TILE_Y[tile]] for tile in tiles(bits)]
+
+def count(bits):
+    """The number of set bits
+    """
+    return bin(bits).count("1")
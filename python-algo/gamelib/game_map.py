@@ -1,6 +1,103 @@
 import math
-from .unit import GameUnit
+import copy
+from .unit import GameUnit, compile_unit_specs
 from .util import debug_write
+from .bitboard import location_mask, range_mask, tiles
+from .geometry import ARENA_LOCATIONS, TILE_ID, TILE_LOCATIONS, ARENA_TILES, HALF_LOCATIONS, EDGES, tile_of, range_stencil, tiles_in_range, tiles_reaching
+
+class TileUnit(GameUnit):
+    """A GameUnit view of the stationary unit stored in the columns of a GameMap
+
+    Reading or setting stability, player_index or pending_removal reads or writes the columns of the map.
+    Once the unit is removed or replaced the view keeps its last values, like a plain GameUnit would.
+
+    """
+    __slots__ = ("_game_map", "_tile", "_stability", "_player_index", "_pending_removal")
+
+    def __init__(self, game_map, tile, spec):
+        self._game_map = game_map
+        self._tile = tile
+        self._unit_specs = game_map.unit_specs
+        self._spec = spec
+        self.x, self.y = TILE_LOCATIONS[tile]
+
+    def _detach(self):
+        game_map, tile = self._game_map, self._tile
+        self._stability = game_map.tile_stability[tile]
+        self._player_index = game_map.tile_owner[tile]
+        self._pending_removal = bool(game_map.tile_pending_removal[tile])
+        self._game_map = None
+
+    @property
+    def stability(self):
+        if self._game_map is None:
+            return self._stability
+        return self._game_map.tile_stability[self._tile]
+
+    @stability.setter
+    def stability(self, value):
+        if self._game_map is None:
+            self._stability = value
+        else:
+            self._game_map.set_stability(self._tile, value)
+
+    @property
+    def player_index(self):
+        if self._game_map is None:
+            return self._player_index
+        return self._game_map.tile_owner[self._tile]
+
+    @player_index.setter
+    def player_index(self, value):
+        if self._game_map is None:
+            self._player_index = value
+        else:
+            self._game_map.set_owner(self._tile, value)
+
+    @property
+    def pending_removal(self):
+        if self._game_map is None:
+            return self._pending_removal
+        return bool(self._game_map.tile_pending_removal[self._tile])
+
+    @pending_removal.setter
+    def pending_removal(self, value):
+        if self._game_map is None:
+            self._pending_removal = value
+        else:
+            self._game_map.set_pending_removal(self._tile, value)
+
+class TileList(list):
+    """The units on one tile of a GameMap, as returned by game_map[x, y]
+
+    Changing the list in place replaces the units on the tile, as if the list were assigned back with
+    game_map[x, y] = units, so code written for maps holding plain lists of units keeps working.
+
+    """
+    __slots__ = ("_game_map", "_location")
+
+    def __init__(self, game_map, location, units):
+        list.__init__(self, units)
+        self._game_map = game_map
+        self._location = location
+
+    def _write_back(self):
+        game_map, location = self._game_map, self._location
+        game_map[location] = list(self)
+        #Stationary units come back as fresh views of the columns
+        list.__setitem__(self, slice(None), game_map.get_units(TILE_ID[location[0]][location[1]]))
+
+def _writes_back(method):
+    def write_back(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self._write_back()
+        return result
+    write_back.__name__ = method.__name__
+    return write_back
+
+for _name in ("__setitem__", "__delitem__", "__iadd__", "__imul__", "append", "extend", "insert", "pop", "remove", "clear", "reverse", "sort"):
+    setattr(TileList, _name, _writes_back(getattr(list, _name)))
+del _name
 
 class GameMap:
     """Holds data about the current game map and provides functions
@@ -9,6 +106,14 @@ class GameMap:
     game_map[x, y] will return a list of Units located at that location, 
     or an empty list if there are no units at the location
 
+    Iterating over the map gives the location of every tile in the arena, row by row from the bottom.
+    Each loop gets its own iterator, so loops over the same map can be nested.
+
+    Stationary units are stored as columns indexed by tile id (see gamelib.geometry), at most one per tile,
+    and game_map[x, y] returns a TileUnit view of them. Information units are kept as GameUnits in mobile_units,
+    as few tiles ever hold one. game_map[x, y] returns a new TileList on every call, and changing it in place
+    changes the map. add_unit and remove_unit are faster ways to change a single unit.
+
     Attributes:
         * config (JSON): Contains information about the game
         * ARENA_SIZE (int): The size of the arena.
@@ -17,6 +122,20 @@ class GameMap:
         * TOP_LEFT (int): A constant that represents the top left edge
         * BOTTOM_LEFT (int): Hidden challenge! Can you guess what this constant represents???
         * BOTTOM_RIGHT (int): A constant that represents the bottom right edge
+        * walls (int): A bitboard of every tile holding a stationary unit, updated as units are added and removed.
+          Pathfinding uses it as an exact key to reuse searches on boards with the same walls.
+        * unit_specs (:obj: UnitSpecs): The stats of every unit type, compiled once per config
+        * unit_types (tuple): The shorthand of each unit type, indexed like the unitInformation of the config
+        * tile_occupied (bytearray): 1 for each tile holding a stationary unit
+        * tile_owner (bytearray): The player index of the stationary unit on each tile
+        * tile_type (bytearray): The index in unit_types of the stationary unit on each tile
+        * tile_stability (list): The stability of the stationary unit on each tile
+        * tile_pending_removal (bytearray): 1 for each stationary unit its owner is removing
+        * mobile_units (dict): Maps the tile id of each tile holding information units to a list of them
+
+    The tile_owner, tile_type, tile_stability and tile_pending_removal columns only mean something where
+    tile_occupied is set. Forks of a map share its columns until one of them changes, so read the columns
+    directly but change them through GameMap methods.
 
     """
     def __init__(self, config):
@@ -34,45 +153,417 @@ class GameMap:
         self.TOP_LEFT = 1
         self.BOTTOM_LEFT = 2
         self.BOTTOM_RIGHT = 3
-        self.__map = self.__empty_grid()
-        self.__start = [13,0]
+        self.unit_specs = compile_unit_specs(config)
+        self.unit_types = self.unit_specs.unit_types
+        self.tile_occupied = bytearray(ARENA_TILES)
+        self.tile_owner = bytearray(ARENA_TILES)
+        self.tile_type = bytearray(ARENA_TILES)
+        self.tile_stability = [0.0] * ARENA_TILES
+        self.tile_pending_removal = bytearray(ARENA_TILES)
+        self.mobile_units = {}
+        for spec in self.unit_specs.specs:
+            range_stencil(spec.range)
+        self.__views = {}
+        self.__bitboards = {}
+        self.__attackers = None
+        self.__shared = False
+        self.__journal = None
+        self.walls = 0
     
     def __getitem__(self, location):
-        if len(location) == 2 and self.in_arena_bounds(location):
-            x,y = location
-            return self.__map[x][y]
+        if len(location) == 2:
+            tile = tile_of(location)
+            if tile != -1:
+                return TileList(self, TILE_LOCATIONS[tile], self.get_units(tile))
         self._invalid_coordinates(location)
 
     def __setitem__(self, location, val):
         if type(location) == tuple and len(location) == 2 and self.in_arena_bounds(location):
-            self.__map[location[0]][location[1]] = val
+            tile = tile_of(location)
+            if self.__journal is not None:
+                self.__record(tile)
+            self.__set_tile(tile, val)
             return
         self._invalid_coordinates(location)
 
     def __iter__(self):
-        self.__start = [13,0]
-        return self
-    
-    def __next__(self):
-        location = self.__start
-        if location == [15,27]:
-            raise StopIteration
-        new_location = [location[0]+1, location[1]]
-        while not self.in_arena_bounds(new_location) and not location == [14,27]:
-            if new_location[0] == self.ARENA_SIZE:
-                new_location = [0, new_location[1]+1]
+        return map(list, TILE_LOCATIONS)
+
+    def half_locations(self, player_index):
+        """Iterates over the locations in one player's half of the arena, in the same order as iterating over the map
+
+        Args:
+            * player_index: The index corresponding to the player owning the half, 0 for you 1 for the enemy
+
+        """
+        return map(list, HALF_LOCATIONS[player_index])
+
+    def occupied_locations(self, player_index=None):
+        """Iterates over the locations holding at least one unit, in the same order as iterating over the map
+
+        Args:
+            * player_index: The index corresponding to the player controlling the units, 0 for you 1 for the enemy, or None for both
+
+        """
+        return (list(TILE_LOCATIONS[tile]) for tile in tiles(self.get_bitboard(None, player_index)))
+
+    def stationary_units(self, player_index=None):
+        """Iterates over the stationary units on the map, in the same order as iterating over the map
+
+        Args:
+            * player_index: The index corresponding to the player controlling the units, 0 for you 1 for the enemy, or None for both
+
+        """
+        owners = self.tile_owner
+        return (self.get_units(tile)[0] for tile in tiles(self.walls) if player_index is None or owners[tile] == player_index)
+
+    def get_units(self, tile):
+        """Gets the units on a tile, like game_map[x, y] but taking a tile id
+
+        Args:
+            * tile: The tile id of a location, see gamelib.geometry
+
+        Returns:
+            A new list holding a view of the stationary unit on the tile, if any, followed by its information units
+
+        """
+        units = []
+        if self.tile_occupied[tile]:
+            view = self.__views.get(tile)
+            if view is None:
+                view = TileUnit(self, tile, self.unit_specs.specs[self.tile_type[tile]])
+                self.__views[tile] = view
+            units.append(view)
+        mobile = self.mobile_units.get(tile)
+        if mobile:
+            units.extend(mobile)
+        return units
+
+    def fork(self):
+        """Makes a copy of the map that can be changed without changing this one
+
+        The copy shares the columns of this map until either map changes, so forking is cheap
+        enough to branch into many hypothetical boards. Information units are copied immediately.
+
+        Returns:
+            A new GameMap with the same units
+
+        """
+        fork = type(self).__new__(type(self))
+        fork.__dict__.update(self.__dict__)
+        fork.mobile_units = {tile: [copy.copy(unit) for unit in units] for tile, units in self.mobile_units.items()}
+        fork.__bitboards = dict(self.__bitboards)
+        fork.__views = {}
+        fork.__journal = None
+        fork.__shared = True
+        self.__shared = True
+        return fork
+
+    def __own_columns(self):
+        """Copies the columns before the first change after a fork, leaving the other maps sharing them untouched
+        """
+        self.tile_occupied = bytearray(self.tile_occupied)
+        self.tile_owner = bytearray(self.tile_owner)
+        self.tile_type = bytearray(self.tile_type)
+        self.tile_stability = list(self.tile_stability)
+        self.tile_pending_removal = bytearray(self.tile_pending_removal)
+        if self.__attackers is not None:
+            self.__attackers = (bytearray(self.__attackers[0]), bytearray(self.__attackers[1]))
+        self.__shared = False
+
+    def checkpoint(self):
+        """Starts recording changes to the map, so they can be undone with rollback
+
+        Returns:
+            A checkpoint to pass to rollback
+
+        """
+        if self.__journal is None:
+            self.__journal = []
+        return len(self.__journal)
+
+    def rollback(self, checkpoint):
+        """Undoes every change made to the map since a checkpoint, in time proportional to the number of changes
+
+        Args:
+            * checkpoint: A checkpoint returned by GameMap.checkpoint
+
+        """
+        journal = self.__journal
+        while len(journal) > checkpoint:
+            self.__restore_tile(*journal.pop())
+
+    def release(self, checkpoint):
+        """Keeps every change made to the map since a checkpoint
+
+        Releasing the first checkpoint stops recording changes and frees the journal. Later checkpoints
+        only hold onto their part of it, so releasing them does nothing until the first one is released.
+
+        Args:
+            * checkpoint: A checkpoint returned by GameMap.checkpoint, which can no longer be rolled back to
+
+        """
+        if checkpoint == 0:
+            self.__journal = None
+
+    def __record(self, tile):
+        """Saves the state of a tile to the journal before it changes
+        """
+        mobile = self.mobile_units.get(tile)
+        # Information units are changed in place by move_unit, so save copies of them
+        self.__journal.append((tile, self.tile_occupied[tile], self.tile_owner[tile], self.tile_type[tile],
+            self.tile_stability[tile], self.tile_pending_removal[tile], [copy.copy(unit) for unit in mobile] if mobile else None))
+
+    def __restore_tile(self, tile, occupied, owner, type_index, stability, pending_removal, mobile):
+        if occupied and self.tile_occupied[tile] and self.tile_type[tile] == type_index:
+            # Keep the same unit, so views of it stay attached
+            if self.__shared:
+                self.__own_columns()
+            if self.tile_owner[tile] != owner:
+                self.__change_owner(tile, owner)
+            self.tile_stability[tile] = stability
+        else:
+            self.__clear_stationary(tile)
+            if occupied:
+                self.__place_stationary(tile, self.unit_types[type_index], owner, stability)
+        if occupied:
+            self.tile_pending_removal[tile] = pending_removal
+        self.__clear_mobile(tile)
+        if mobile:
+            for unit in mobile:
+                self.__place_mobile(tile, unit)
+
+    def __clear_tile(self, tile):
+        self.__clear_stationary(tile)
+        self.__clear_mobile(tile)
+
+    def __clear_mobile(self, tile):
+        mobile = self.mobile_units.pop(tile, None)
+        if mobile:
+            bitboards = self.__bitboards
+            for unit in mobile:
+                key = (unit.player_index, unit.unit_type)
+                bitboards[key] &= ~(1 << tile)
+
+    def __clear_stationary(self, tile):
+        if self.tile_occupied[tile]:
+            if self.__shared:
+                self.__own_columns()
+            if self.__attackers is not None and self.unit_types[self.tile_type[tile]] == self.unit_specs.DESTRUCTOR:
+                self.__stamp_attacker(tile, self.tile_owner[tile], -1)
+            bit = 1 << tile
+            self.__bitboards[(self.tile_owner[tile], self.unit_types[self.tile_type[tile]])] &= ~bit
+            self.walls &= ~bit
+            view = self.__views.pop(tile, None)
+            if view is not None:
+                view._detach()
+            self.tile_occupied[tile] = 0
+            self.tile_pending_removal[tile] = 0
+
+    def __place_stationary(self, tile, unit_type, player_index, stability):
+        """Writes a stationary unit into the columns of an empty tile
+        """
+        if self.__shared:
+            self.__own_columns()
+        self.tile_occupied[tile] = 1
+        self.tile_owner[tile] = player_index
+        self.tile_type[tile] = self.unit_specs.type_index[unit_type]
+        self.tile_stability[tile] = stability
+        bit = 1 << tile
+        key = (player_index, unit_type)
+        self.__bitboards[key] = self.__bitboards.get(key, 0) | bit
+        self.walls |= bit
+        if self.__attackers is not None and unit_type == self.unit_specs.DESTRUCTOR:
+            self.__stamp_attacker(tile, player_index, 1)
+
+    def __place_mobile(self, tile, unit):
+        mobile = self.mobile_units.get(tile)
+        if mobile is None:
+            self.mobile_units[tile] = [unit]
+        else:
+            mobile.append(unit)
+        key = (unit.player_index, unit.unit_type)
+        self.__bitboards[key] = self.__bitboards.get(key, 0) | (1 << tile)
+
+    def __set_tile(self, tile, units):
+        """Replaces the units on a tile, keeping the columns and bitboards up to date
+        """
+        self.__clear_tile(tile)
+        for unit in units:
+            if not unit.stationary:
+                self.__place_mobile(tile, unit)
+            elif self.tile_occupied[tile]:
+                self.warn("Only one stationary unit can be placed at {}, ignoring {}".format(list(TILE_LOCATIONS[tile]), unit))
             else:
-                new_location = [new_location[0]+1, new_location[1]]
-        self.__start = new_location
-        return location 
-
-    def __empty_grid(self):
-        grid = []
-        for x in range(0, self.ARENA_SIZE):
-            grid.append([])
-            for _ in range(0, self.ARENA_SIZE):
-                grid[x].append([])
-        return grid
+                self.__place_stationary(tile, unit.unit_type, unit.player_index, unit.stability)
+                self.tile_pending_removal[tile] = 1 if unit.pending_removal else 0
+
+    def set_owner(self, tile, player_index):
+        """Changes the player controlling the stationary unit on a tile
+
+        Args:
+            * tile: The tile id of an occupied tile
+            * player_index: The index corresponding to the new controlling player, 0 for you 1 for the enemy
+
+        """
+        if self.__journal is not None:
+            self.__record(tile)
+        if self.__shared:
+            self.__own_columns()
+        self.__change_owner(tile, player_index)
+
+    def __change_owner(self, tile, player_index):
+        bit = 1 << tile
+        unit_type = self.unit_types[self.tile_type[tile]]
+        bitboards = self.__bitboards
+        bitboards[(self.tile_owner[tile], unit_type)] &= ~bit
+        if self.__attackers is not None and unit_type == self.unit_specs.DESTRUCTOR:
+            self.__stamp_attacker(tile, self.tile_owner[tile], -1)
+            self.__stamp_attacker(tile, player_index, 1)
+        self.tile_owner[tile] = player_index
+        key = (player_index, unit_type)
+        bitboards[key] = bitboards.get(key, 0) | bit
+
+    def set_stability(self, tile, stability):
+        """Changes the stability of the stationary unit on a tile
+
+        Args:
+            * tile: The tile id of an occupied tile
+            * stability: The new stability of the unit
+
+        """
+        if self.__journal is not None:
+            self.__record(tile)
+        if self.__shared:
+            self.__own_columns()
+        self.tile_stability[tile] = stability
+
+    def set_pending_removal(self, tile, pending_removal=True):
+        """Marks the stationary unit on a tile as being removed by its owner, or not
+
+        Args:
+            * tile: The tile id of an occupied tile
+            * pending_removal: Whether the unit is being removed
+
+        """
+        if self.__journal is not None:
+            self.__record(tile)
+        if self.__shared:
+            self.__own_columns()
+        self.tile_pending_removal[tile] = 1 if pending_removal else 0
+
+    def get_bitboard(self, unit_type=None, player_index=None):
+        """Gets a bitboard of the tiles holding units of a given type and player, see gamelib.bitboard
+
+        Args:
+            * unit_type: The type of unit to look for, or None for any type
+            * player_index: The index corresponding to the player controlling the units, 0 for you 1 for the enemy, or None for both
+
+        Returns:
+            An int where bit n is set if the tile with id n holds a matching unit
+
+        """
+        bits = 0
+        for (unit_player, unit_unit_type), board in self.__bitboards.items():
+            if (unit_type is None or unit_unit_type == unit_type) and (player_index is None or unit_player == player_index):
+                bits |= board
+        return bits
+
+    def get_attacker_counts(self, player_index):
+        """Gets the number of enemy destructors that can attack a unit of the given player on each tile
+
+        The counts are worked out the first time they are asked for, by adding the range of each destructor
+        once, and are then kept up to date as destructors are added, removed or rolled back.
+
+        Args:
+            * player_index: The index corresponding to the player whose units are attacked, 0 for you 1 for the enemy
+
+        Returns:
+            A bytearray indexed by tile id. It changes along with the map, so copy it to keep the current counts
+
+        """
+        if self.__attackers is None:
+            self.__attackers = (bytearray(ARENA_TILES), bytearray(ARENA_TILES))
+            destructor_index = self.unit_specs.type_index[self.unit_specs.DESTRUCTOR]
+            for tile in tiles(self.walls):
+                if self.tile_type[tile] == destructor_index:
+                    self.__stamp_attacker(tile, self.tile_owner[tile], 1)
+        return self.__attackers[player_index]
+
+    def __stamp_attacker(self, tile, player_index, change):
+        """Adds change to the attacker counts of the tiles a destructor of the given player on the tile can attack
+        """
+        counts = self.__attackers[1 - player_index]
+        for reached in tiles_reaching(tile, self.unit_specs.by_type[self.unit_specs.DESTRUCTOR].range):
+            counts[reached] += change
+
+    def __matching_units(self, tile, unit_type, player_index):
+        return [unit for unit in self.get_units(tile) if (unit_type is None or unit.unit_type == unit_type) and (player_index is None or unit.player_index == player_index)]
+
+    def get_all_units(self, unit_type=None, player_index=None):
+        """Gets every unit of a given type and player, using the bitboards instead of searching the map
+
+        Args:
+            * unit_type: The type of unit to look for, or None for any type
+            * player_index: The index corresponding to the player controlling the units, 0 for you 1 for the enemy, or None for both
+
+        Returns:
+            A list of the matching units, in the same order as iterating over the map
+
+        """
+        units = []
+        for tile in tiles(self.get_bitboard(unit_type, player_index)):
+            units.extend(self.__matching_units(tile, unit_type, player_index))
+        return units
+
+    def get_units_in_range(self, location, radius, unit_type=None, player_index=None):
+        """Gets the units of a given type and player in a circular area around a location
+
+        Args:
+            * location: The center of our search area
+            * radius: The radius of our search area
+            * unit_type: The type of unit to look for, or None for any type
+            * player_index: The index corresponding to the player controlling the units, 0 for you 1 for the enemy, or None for both
+
+        Returns:
+            A list of the matching units, in the same order as their locations in get_locations_in_range
+
+        """
+        tile = tile_of(location)
+        if tile != -1:
+            mask = range_mask(tile, radius)
+        else:
+            mask = location_mask(self.get_locations_in_range(location, radius))
+        units = []
+        # get_locations_in_range goes column by column, so sort the tiles by x then y
+        for in_range in sorted(tiles(self.get_bitboard(unit_type, player_index) & mask), key=TILE_LOCATIONS.__getitem__):
+            units.extend(self.__matching_units(in_range, unit_type, player_index))
+        return units
+
+    def get_nearest_unit(self, location, unit_type=None, player_index=None):
+        """Gets the unit of a given type and player closest to a location
+
+        Args:
+            * location: The location to measure distance from
+            * unit_type: The type of unit to look for, or None for any type
+            * player_index: The index corresponding to the player controlling the units, 0 for you 1 for the enemy, or None for both
+
+        Returns:
+            The closest matching unit, preferring the first in map order when several are equally close, or None if there are none
+
+        """
+        x, y = location
+        nearest_tile = -1
+        nearest_distance = 0
+        for tile in tiles(self.get_bitboard(unit_type, player_index)):
+            tile_x, tile_y = TILE_LOCATIONS[tile]
+            distance = (tile_x - x)**2 + (tile_y - y)**2
+            if nearest_tile == -1 or distance < nearest_distance:
+                nearest_tile = tile
+                nearest_distance = distance
+        if nearest_tile == -1:
+            return None
+        return self.__matching_units(nearest_tile, unit_type, player_index)[0]
 
     def _invalid_coordinates(self, location):
         self.warn("{} is out of bounds.".format(str(location)))
@@ -88,19 +579,7 @@ class GameMap:
         
         """
         x, y = location
-        half_board = self.HALF_ARENA
-
-        row_size = y + 1
-        startx = half_board - row_size
-        endx = startx + (2 * row_size) - 1
-        top_half_check = (y < self.HALF_ARENA and x >= startx and x <= endx)
-
-        row_size = (self.ARENA_SIZE - 1 - y) + 1
-        startx = half_board - row_size
-        endx = startx + (2 * row_size) - 1
-        bottom_half_check = (y >= self.HALF_ARENA and x >= startx and x <= endx)
-
-        return bottom_half_check or top_half_check
+        return (x, y) in ARENA_LOCATIONS
 
     def get_edge_locations(self, quadrant_description):
         """Takes in an edge description and returns a list of locations.
@@ -120,8 +599,7 @@ class GameMap:
             self.warn("Passed invalid quadrant_description '{}'. See the documentation for valid inputs for get_edge_locations.".format(quadrant_description))
             return
 
-        edges = self.get_edges()
-        return edges[quadrant_description]
+        return [list(location) for location in EDGES[quadrant_description]]
 
     def get_edges(self):
         """Gets all of the edges and their edge locations
@@ -130,50 +608,72 @@ class GameMap:
             A list with four lists inside of it of locations corresponding to the four edges.
             [0] = top_right, [1] = top_left, [2] = bottom_left, [3] = bottom_right.
         """
-        top_right = []
-        for num in range(0, self.HALF_ARENA):
-            x = self.HALF_ARENA + num
-            y = self.ARENA_SIZE - 1 - num
-            top_right.append([int(x), int(y)])
-        top_left = []
-        for num in range(0, self.HALF_ARENA):
-            x = self.HALF_ARENA - 1 - num
-            y = self.ARENA_SIZE - 1 - num
-            top_left.append([int(x), int(y)])
-        bottom_left = []
-        for num in range(0, self.HALF_ARENA):
-            x = self.HALF_ARENA - 1 - num
-            y = num
-            bottom_left.append([int(x), int(y)])
-        bottom_right = []
-        for num in range(0, self.HALF_ARENA):
-            x = self.HALF_ARENA + num
-            y = num
-            bottom_right.append([int(x), int(y)])
-        return [top_right, top_left, bottom_left, bottom_right]
-    
-    def add_unit(self, unit_type, location, player_index=0):
+        return [[list(location) for location in edge] for edge in EDGES]
+
+    def add_unit(self, unit_type, location, player_index=0, stability=None, num=1):
         """Add a single GameUnit to the map at the given location.
 
         Args:
             * unit_type: The type of the new unit
             * location: The location of the new unit
             * player_index: The index corresponding to the player controlling the new unit, 0 for you 1 for the enemy
+            * stability: The current stability of the new unit, defaults to its max stability
+            * num: The number of information units to add at once. Only one stationary unit is ever added
+
+        Returns:
+            The new unit, or the last of them when adding several
 
+        Nothing is added if the location or the player index is invalid, as the map only holds units of players 0 and 1.
         This function does not affect your turn and only changes the data stored in GameMap. The intended use of this function
         is to allow you to create arbitrary gamestates. Using this function on the GameMap inside game_state can cause your algo to crash.
         """
         if not self.in_arena_bounds(location):
             self._invalid_coordinates(location)
+            return
         if player_index < 0 or player_index > 1:
             self.warn("Player index {} is invalid. Player index should be 0 or 1.".format(player_index))
+            return
 
-        x, y = location
-        new_unit = GameUnit(unit_type, self.config, player_index, None, location[0], location[1])
-        if not new_unit.stationary:
-            self.__map[x][y].append(new_unit)
-        else:
-            self.__map[x][y] = [new_unit]
+        tile = tile_of(location)
+        if self.__journal is not None:
+            self.__record(tile)
+        spec = self.unit_specs.by_type[unit_type]
+        if not spec.stationary:
+            unit = None
+            for _ in range(num):
+                unit = GameUnit(unit_type, self.config, player_index, stability, location[0], location[1])
+                self.__place_mobile(tile, unit)
+            return unit
+        self.__clear_tile(tile)
+        self.__place_stationary(tile, unit_type, player_index, stability if stability else spec.max_stability)
+        return self.get_units(tile)[0]
+
+    def add_units(self, unit_type, units, player_index=0):
+        """Adds many units of one type to the map, filling the columns directly instead of creating a GameUnit for each
+
+        Args:
+            * unit_type: The type of the new units
+            * units: A list of [x, y, stability] lists, like one of the unit lists of p1Units or p2Units in a game state.
+              A stability of 0 means max stability, as in add_unit
+            * player_index: The index corresponding to the player controlling the new units, 0 for you 1 for the enemy
+
+        Unlike add_unit, a new stationary unit does not remove the information units on its tile, matching how
+        the engine reports units. Like add_unit, this function only changes the data stored in GameMap.
+        """
+        spec = self.unit_specs.by_type[unit_type]
+        for unit in units:
+            x, y, stability = unit[:3]
+            tile = tile_of([int(x), int(y)])
+            if tile == -1:
+                self._invalid_coordinates([x, y])
+                continue
+            if self.__journal is not None:
+                self.__record(tile)
+            if spec.stationary:
+                self.__clear_stationary(tile)
+                self.__place_stationary(tile, unit_type, player_index, float(stability) or spec.max_stability)
+            else:
+                self.__place_mobile(tile, GameUnit(unit_type, self.config, player_index, float(stability), int(x), int(y)))
 
     def remove_unit(self, location):
         """Remove all units on the map in the given location.
@@ -186,13 +686,74 @@ class GameMap:
         """
         if not self.in_arena_bounds(location):
             self._invalid_coordinates(location)
-        
-        x, y = location
-        self.__map[x][y] = []
+            return
+
+        tile = tile_of(location)
+        if self.__journal is not None:
+            self.__record(tile)
+        self.__clear_tile(tile)
+
+    def delete_unit(self, unit):
+        """Remove a single unit from the map, leaving the other units on its location.
+
+        Args:
+            * unit: A unit on the map, as returned by game_map[x, y]
+
+        Returns:
+            True if the unit was on the map and has been removed
+
+        Like remove_unit, this function only changes the data stored in GameMap.
+        """
+        tile = tile_of([unit.x, unit.y])
+        if tile == -1:
+            return False
+        if unit.stationary:
+            if not self.tile_occupied[tile] or self.unit_types[self.tile_type[tile]] != unit.unit_type or self.tile_owner[tile] != unit.player_index:
+                return False
+            if self.__journal is not None:
+                self.__record(tile)
+            self.__clear_stationary(tile)
+            return True
+        mobile = self.mobile_units.get(tile)
+        if not mobile or not any(other is unit for other in mobile):
+            return False
+        if self.__journal is not None:
+            self.__record(tile)
+        remaining = [other for other in mobile if other is not unit]
+        self.__clear_mobile(tile)
+        for other in remaining:
+            self.__place_mobile(tile, other)
+        return True
+
+    def move_unit(self, unit, location):
+        """Move an information unit on the map to another location, updating its x and y.
+
+        Args:
+            * unit: An information unit on the map, as returned by game_map[x, y]
+            * location: The location to move the unit to
+
+        Like add_unit, this function only changes the data stored in GameMap.
+        """
+        if unit.stationary:
+            self.warn("Stationary units cannot move, not moving {}".format(unit))
+            return
+        if not self.in_arena_bounds(location):
+            self._invalid_coordinates(location)
+            return
+        if not self.delete_unit(unit):
+            self.warn("{} is not on the map, so cannot be moved".format(unit))
+            return
+        tile = tile_of(location)
+        if self.__journal is not None:
+            self.__record(tile)
+        unit.x, unit.y = int(location[0]), int(location[1])
+        self.__place_mobile(tile, unit)
 
     def get_locations_in_range(self, location, radius):
         """Gets locations in a circular area around a location
 
+        The locations in range of each tile are only computed once, see gamelib.geometry.tiles_in_range
+
         Args:
             * location: The center of our search area
             * radius: The radius of our search area
@@ -206,6 +767,10 @@ class GameMap:
         if not self.in_arena_bounds(location):
             self._invalid_coordinates(location)
 
+        tile = tile_of(location)
+        if tile != -1:
+            return [list(TILE_LOCATIONS[in_range]) for in_range in tiles_in_range(tile, radius)]
+
         x, y = location
         locations = []
         for i in range(int(x - radius), int(x + radius + 1)):
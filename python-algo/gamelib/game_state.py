@@ -1,14 +1,33 @@
+import sys
 import math
 import json
 
 from .navigation import ShortestPathFinder
-from .util import send_command, debug_write
-from .unit import GameUnit
+from .util import send_command, debug_write, load_state
+from .unit import GameUnit, compile_unit_specs
 from .game_map import GameMap
+from .simulator import ActionSimulator
+from .bitboard import range_mask, tiles
+from .geometry import EDGE_LOCATION_SETS, TILE_LOCATIONS, X_MAJOR_RANK, tile_of
+
+_bound_specs = None
 
 def is_stationary(unit_type):
     return unit_type in FIREWALL_TYPES
 
+def _bind_unit_types(unit_specs):
+    """Sets the module level unit type constants, which older code reads, when the config changes
+    """
+    global _bound_specs, FILTER, ENCRYPTOR, DESTRUCTOR, PING, EMP, SCRAMBLER, REMOVE, FIREWALL_TYPES, ALL_UNITS, UNIT_TYPE_TO_INDEX
+    if unit_specs is _bound_specs:
+        return
+    _bound_specs = unit_specs
+    FILTER, ENCRYPTOR, DESTRUCTOR = unit_specs.FILTER, unit_specs.ENCRYPTOR, unit_specs.DESTRUCTOR
+    PING, EMP, SCRAMBLER, REMOVE = unit_specs.PING, unit_specs.EMP, unit_specs.SCRAMBLER, unit_specs.REMOVE
+    UNIT_TYPE_TO_INDEX = dict(unit_specs.type_index)
+    ALL_UNITS = list(unit_specs.ALL_UNITS)
+    FIREWALL_TYPES = list(unit_specs.FIREWALL_TYPES)
+
 class GameState:
     """Represents the entire gamestate for a given turn
     Provides methods related to resources and unit deployment
@@ -22,6 +41,7 @@ class GameState:
         * EMP (str): A constant representing the emp unit
         * SCRAMBLER (str): A constant representing the scrambler unit
         * FIREWALL_TYPES (list): A list of the firewall units
+        * unit_specs (:obj: UnitSpecs): The stats of every unit type, compiled once per config
 
         * ARENA_SIZE (int): The size of the arena
         * HALF_ARENA (int): Half the size of the arena
@@ -34,61 +54,69 @@ class GameState:
         * my_time (int): The time you took to submit your previous turn
         * enemy_health (int): Your opponents current remaining health
         * enemy_time (int): Your opponents current remaining time
+        * lazy (bool): Whether the map is only built when it is first used, see __init__
+        * materialized (dict): How much of this turn has been built. "game_map" and "path_finder" count the maps
+          and pathfinders built, "units" counts the units placed on the map while parsing
+        * delta (list): When built from the previous turn, the changes to the stationary units of each player since then,
+          indexed by player. Each holds the locations of the units "built", "destroyed", "damaged" and newly
+          marked for "removal". None otherwise
+        * layout_changed (bool): False when built from the previous turn and no stationary unit was built or destroyed
 
     """
 
-    def __init__(self, config, serialized_string):
+    def __init__(self, config, serialized_string, lazy=False, previous=None):
         """ Setup a turns variables using arguments passed
 
         Args:
             * config (JSON): A json object containing information about the game
-            * serialized_string (string): A string containing information about the game state at the start of this turn
+            * serialized_string (string): A string containing information about the game state at the start of this turn.
+              The json can also be passed already decoded, as a dict or a GameMessage, to avoid parsing it again
+            * lazy: If true, only the stats and resources are read here. The map and its units are built the first time
+              game_map is used, directly or through methods such as contains_stationary_unit or find_path_to_edge
+            * previous: The GameState of the previous turn. The units are then compared with the previous turn, and
+              the map of the previous turn, as it was parsed, is updated instead of building a new one. The previous
+              state keeps working, but only one later state can reuse its map
 
         """
         self.serialized_string = serialized_string
         self.config = config
         self.enable_warnings = True
+        self.lazy = lazy
+        self.materialized = {"game_map": 0, "units": 0, "path_finder": 0}
 
-        global FILTER, ENCRYPTOR, DESTRUCTOR, PING, EMP, SCRAMBLER, REMOVE, FIREWALL_TYPES, ALL_UNITS, UNIT_TYPE_TO_INDEX
-        UNIT_TYPE_TO_INDEX = {}
-        FILTER = config["unitInformation"][0]["shorthand"]
-        UNIT_TYPE_TO_INDEX[FILTER] = 0
-        ENCRYPTOR = config["unitInformation"][1]["shorthand"]
-        UNIT_TYPE_TO_INDEX[ENCRYPTOR] = 1
-        DESTRUCTOR = config["unitInformation"][2]["shorthand"]
-        UNIT_TYPE_TO_INDEX[DESTRUCTOR] = 2
-        PING = config["unitInformation"][3]["shorthand"]
-        UNIT_TYPE_TO_INDEX[PING] = 3
-        EMP = config["unitInformation"][4]["shorthand"]
-        UNIT_TYPE_TO_INDEX[EMP] = 4
-        SCRAMBLER = config["unitInformation"][5]["shorthand"]
-        UNIT_TYPE_TO_INDEX[SCRAMBLER] = 5
-        REMOVE = config["unitInformation"][6]["shorthand"]
-        UNIT_TYPE_TO_INDEX[REMOVE] = 6
-
-        ALL_UNITS = [PING, EMP, SCRAMBLER, FILTER, ENCRYPTOR, DESTRUCTOR]
-        FIREWALL_TYPES = [FILTER, ENCRYPTOR, DESTRUCTOR]
+        self.unit_specs = compile_unit_specs(config)
+        _bind_unit_types(self.unit_specs)
 
         self.ARENA_SIZE = 28
         self.HALF_ARENA = int(self.ARENA_SIZE / 2)
         self.BITS = 0
         self.CORES = 1
 
-        self.game_map = GameMap(self.config)
-        self._shortest_path_finder = ShortestPathFinder()
+        self.__game_map = None
+        self.__parsed_map = None
+        self.__base_map = None
+        self.__path_finder = None
+        # Results that only depend on which tiles hold which stationary units, kept across turns while the layout is unchanged
+        self._layout_caches = {}
+        self.delta = None
+        self.layout_changed = True
         self._build_stack = []
         self._deploy_stack = []
         self._player_resources = [
                 {'cores': 0, 'bits': 0},  # player 0, which is you
                 {'cores': 0, 'bits': 0}]  # player 1, which is the opponent
         self.__parse_state(serialized_string)
+        if previous is not None:
+            self.__continue_from(previous)
+        if not lazy:
+            self.__build_map()
 
     def __parse_state(self, state_line):
         """
         Fills in map based on the serialized game state so that self.game_map[x,y] is a list of GameUnits at that location.
-        state_line is the game state as a json string.
+        state_line is the game state as a json string, a GameMessage or an already decoded dict.
         """
-        state = json.loads(state_line)
+        state = load_state(state_line)
 
         turn_info = state["turnInfo"]
         self.turn_number = int(turn_info[1])
@@ -105,34 +133,195 @@ class GameState:
             {'cores': p1_cores, 'bits': p1_bits},
             {'cores': p2_cores, 'bits': p2_bits}]
 
-        p1units = state["p1Units"]
-        p2units = state["p2Units"]
+        self.__unit_lists = (state["p1Units"], state["p2Units"])
 
-        self.__create_parsed_units(p1units, 0)
-        self.__create_parsed_units(p2units, 1)
+    def __build_map(self):
+        """
+        Creates the map and fills it with the units read by __parse_state, or updates the map of the previous turn.
+        A copy of the map as parsed is kept for the next turn.
+        """
+        self.materialized["game_map"] += 1
+        if self.__base_map is not None:
+            self.__game_map, changed_tiles = self.__base_map
+            self.__base_map = None
+            self.__game_map.enable_warnings = self.enable_warnings
+            for tile, contents in changed_tiles.items():
+                self.__update_tile(tile, *contents)
+        else:
+            self.__game_map = GameMap(self.config)
+            self.__game_map.enable_warnings = self.enable_warnings
+            p1units, p2units = self.__unit_lists
+            self.__create_parsed_units(p1units, 0)
+            self.__create_parsed_units(p2units, 1)
+        self.__parsed_map = self.__game_map.fork()
+        return self.__game_map
+
+    def __tile_contents(self, locations=None):
+        """
+        Reads the unit lists into a dict mapping each tile id holding units to [stationary, mobile, pending_removal],
+        following the same rules as __create_parsed_units. stationary is a (type index, player index, stability) tuple
+        or None, mobile is a list of (unit type, player index, stability) tuples.
+        Only the units at the given set of (x, y) locations are read, unless locations is None.
+        """
+        unit_specs = self.unit_specs
+        contents = {}
+        for player_index, units in enumerate(self.__unit_lists):
+            for i, unit_types in enumerate(units):
+                unit_type = unit_specs.unit_types[i]
+                if locations is not None:
+                    unit_types = [uinfo for uinfo in unit_types if (uinfo[0], uinfo[1]) in locations]
+                if unit_type == unit_specs.REMOVE:
+                    for uinfo in unit_types:
+                        tile_contents = contents.get(tile_of([int(uinfo[0]), int(uinfo[1])]))
+                        if tile_contents is not None and tile_contents[0] is not None:
+                            tile_contents[2] = True
+                    continue
+                spec = unit_specs.by_type[unit_type]
+                for uinfo in unit_types:
+                    x, y, stability = uinfo[:3]
+                    tile = tile_of([int(x), int(y)])
+                    if tile == -1:
+                        continue
+                    tile_contents = contents.get(tile)
+                    if tile_contents is None:
+                        tile_contents = contents[tile] = [None, [], False]
+                    if spec.stationary:
+                        tile_contents[0] = (spec.index, player_index, float(stability) or spec.max_stability)
+                        tile_contents[2] = False
+                    else:
+                        tile_contents[1].append((unit_type, player_index, float(stability)))
+        return contents
+
+    def __changed_locations(self, previous):
+        """
+        The (x, y) of every unit entry that is not in the previous turn, or was and is gone. Unit lists equal to those
+        of the previous turn are skipped without looking at their units. None if a list repeats an entry, as the
+        lists can then not be compared entry by entry.
+        """
+        changed = set()
+        for old_units, new_units in zip(previous.__unit_lists, self.__unit_lists):
+            for old_list, new_list in zip(old_units, new_units):
+                if old_list == new_list:
+                    continue
+                old_entries = set(map(tuple, old_list))
+                new_entries = set(map(tuple, new_list))
+                if len(old_entries) != len(old_list) or len(new_entries) != len(new_list):
+                    return None
+                for entry in old_entries ^ new_entries:
+                    changed.add((entry[0], entry[1]))
+        return changed
+
+    def __continue_from(self, previous):
+        """
+        Compares the units with those of the previous turn, filling in delta and layout_changed, and takes over
+        the map of the previous turn as it was parsed, along with the caches that only depend on the layout.
+        """
+        locations = self.__changed_locations(previous)
+        old_contents = previous.__tile_contents(locations)
+        new_contents = self.__tile_contents(locations)
+        delta = [{"built": [], "destroyed": [], "damaged": [], "removal": []} for _ in range(2)]
+        changed_tiles = {}
+        empty = (None, [], False)
+        for tile in old_contents.keys() | new_contents.keys():
+            old = old_contents.get(tile, empty)
+            new = new_contents.get(tile, empty)
+            if old == new:
+                continue
+            changed_tiles[tile] = (old, new)
+            old_stationary, new_stationary = old[0], new[0]
+            location = list(TILE_LOCATIONS[tile])
+            if old_stationary is not None and (new_stationary is None or new_stationary[:2] != old_stationary[:2]):
+                delta[old_stationary[1]]["destroyed"].append(location)
+                old_stationary = None
+            if new_stationary is None:
+                continue
+            player_delta = delta[new_stationary[1]]
+            if old_stationary is None:
+                player_delta["built"].append(location)
+            elif new_stationary[2] < old_stationary[2]:
+                player_delta["damaged"].append(location)
+            if new[2] and not (old_stationary is not None and old[2]):
+                player_delta["removal"].append(location)
+        self.delta = delta
+        self.layout_changed = any(player_delta["built"] or player_delta["destroyed"] for player_delta in delta)
+
+        parsed_map = previous.__parsed_map
+        if parsed_map is not None:
+            previous.__parsed_map = None
+            self.__base_map = (parsed_map, changed_tiles)
+        if not self.layout_changed:
+            self.__path_finder = previous.__path_finder
+            self._layout_caches = previous._layout_caches
+
+    def __update_tile(self, tile, old, new):
+        """
+        Changes a tile of the map of the previous turn from its old contents to its new contents, see __tile_contents.
+        """
+        game_map = self.__game_map
+        old_stationary, old_mobile, _ = old
+        stationary, mobile, pending_removal = new
+        if old_stationary is not None and stationary is not None and old_stationary[:2] == stationary[:2] and old_mobile == mobile:
+            if old_stationary[2] != stationary[2]:
+                game_map.set_stability(tile, stationary[2])
+            if pending_removal != old[2]:
+                game_map.set_pending_removal(tile, pending_removal)
+        else:
+            location = list(TILE_LOCATIONS[tile])
+            x, y = location
+            game_map.remove_unit(location)
+            if stationary is not None:
+                type_index, player_index, stability = stationary
+                game_map.add_units(self.unit_specs.unit_types[type_index], [[x, y, stability]], player_index)
+                self.materialized["units"] += 1
+            for unit_type, player_index, stability in mobile:
+                game_map.add_units(unit_type, [[x, y, stability]], player_index)
+                self.materialized["units"] += 1
+            if pending_removal:
+                game_map.set_pending_removal(tile)
+
+    @property
+    def game_map(self):
+        game_map = self.__game_map
+        if game_map is None:
+            game_map = self.__build_map()
+        return game_map
+
+    @game_map.setter
+    def game_map(self, game_map):
+        self.__game_map = game_map
+        self.__base_map = None
+
+    @property
+    def _shortest_path_finder(self):
+        if self.__path_finder is None:
+            self.__path_finder = ShortestPathFinder()
+            self.materialized["path_finder"] += 1
+        return self.__path_finder
+
+    @_shortest_path_finder.setter
+    def _shortest_path_finder(self, path_finder):
+        self.__path_finder = path_finder
 
     def __create_parsed_units(self, units, player_number):
         """
         Helper function for __parse_state to add units to the map.
         """
-        typedef = self.config.get("unitInformation")
+        game_map = self.game_map
         for i, unit_types in enumerate(units):
-            for uinfo in unit_types:
-                unit_type = typedef[i].get("shorthand")
-                sx, sy, shp = uinfo[:3]
-                x, y = map(int, [sx, sy])
-                hp = float(shp)
-                # This depends on RM always being the last type to be processed
-                if unit_type == REMOVE:
+            unit_type = self.unit_specs.unit_types[i]
+            # This depends on RM always being the last type to be processed
+            if unit_type == self.unit_specs.REMOVE:
+                for uinfo in unit_types:
                     # Quick fix will deploy engine fix soon
-                    if self.contains_stationary_unit([x,y]):
-                        self.game_map[x,y][0].pending_removal = True
-                else:
-                    unit = GameUnit(unit_type, self.config, player_number, hp, x, y)
-                    self.game_map[x,y].append(unit)
+                    tile = tile_of([int(uinfo[0]), int(uinfo[1])])
+                    if tile != -1 and game_map.tile_occupied[tile]:
+                        game_map.set_pending_removal(tile)
+            else:
+                game_map.add_units(unit_type, unit_types, player_number)
+                self.materialized["units"] += len(unit_types)
 
     def __resource_required(self, unit_type):
-        return self.CORES if is_stationary(unit_type) else self.BITS
+        return self.unit_specs.by_type[unit_type].resource
 
     def __set_resource(self, resource_type, amount, player_index=0):
         """
@@ -158,7 +347,7 @@ class GameState:
         
         """
         build_string = json.dumps(self._build_stack)
-        deploy_string = json.dumps(self._deploy_stack)
+        deploy_string = json.dumps([(unit_type, x, y) for unit_type, x, y, count in self._deploy_stack for _ in range(count)])
         send_command(build_string)
         send_command(deploy_string)
 
@@ -197,7 +386,7 @@ class GameState:
             The number of units affordable of the given unit_type.
 
         """
-        if unit_type not in ALL_UNITS:
+        if unit_type not in self.unit_specs.by_type:
             self._invalid_unit(unit_type)
             return
 
@@ -245,12 +434,11 @@ class GameState:
             The units cost
 
         """
-        if unit_type not in ALL_UNITS:
+        if unit_type not in self.unit_specs.by_type:
             self._invalid_unit(unit_type)
             return
 
-        unit_def = self.config["unitInformation"][UNIT_TYPE_TO_INDEX[unit_type]]
-        return unit_def.get('cost')
+        return self.unit_specs.by_type[unit_type].cost
 
     def can_spawn(self, unit_type, location, num=1):
         """Check if we can spawn a unit at a location. 
@@ -268,7 +456,7 @@ class GameState:
             True if we can spawn the unit(s)
 
         """
-        if unit_type not in ALL_UNITS:
+        if unit_type not in self.unit_specs.by_type:
             self._invalid_unit(unit_type)
             return
         
@@ -278,10 +466,11 @@ class GameState:
             return False
 
         affordable = self.number_affordable(unit_type) >= num
-        stationary = is_stationary(unit_type)
+        stationary = self.unit_specs.by_type[unit_type].stationary
         blocked = self.contains_stationary_unit(location) or (stationary and len(self.game_map[location[0],location[1]]) > 0)
         correct_territory = location[1] < self.HALF_ARENA
-        on_edge = location in (self.game_map.get_edge_locations(self.game_map.BOTTOM_LEFT) + self.game_map.get_edge_locations(self.game_map.BOTTOM_RIGHT))
+        x, y = location
+        on_edge = (x, y) in EDGE_LOCATION_SETS[self.game_map.BOTTOM_LEFT] or (x, y) in EDGE_LOCATION_SETS[self.game_map.BOTTOM_RIGHT]
 
         if self.enable_warnings:
             fail_reason = ""
@@ -303,6 +492,10 @@ class GameState:
     def attempt_spawn(self, unit_type, locations, num=1):
         """Attempts to spawn new units with the type given in the given locations.
 
+        Information units are deployed in bulk: each location is checked once, as many of the num units as can
+        be afforded are deployed there at once and the deployment is queued as a single (unit_type, x, y, count)
+        entry.
+
         Args:
             * unit_type: The type of unit we want to spawn
             * locations: A single location or list of locations to spawn units at
@@ -312,7 +505,7 @@ class GameState:
             The number of units successfully spawned
 
         """
-        if unit_type not in ALL_UNITS:
+        if unit_type not in self.unit_specs.by_type:
             self._invalid_unit(unit_type)
             return
         if num < 1:
@@ -321,6 +514,9 @@ class GameState:
       
         if type(locations[0]) == int:
             locations = [locations]
+        spec = self.unit_specs.by_type[unit_type]
+        if not spec.stationary:
+            return self.__deploy(spec, locations, num)
         spawned_units = 0
         for location in locations:
             for i in range(num):
@@ -330,13 +526,30 @@ class GameState:
                     resource_type = self.__resource_required(unit_type)
                     self.__set_resource(resource_type, 0 - cost)
                     self.game_map.add_unit(unit_type, location, 0)
-                    if is_stationary(unit_type):
-                        self._build_stack.append((unit_type, x, y))
-                    else:
-                        self._deploy_stack.append((unit_type, x, y))
+                    self._build_stack.append((unit_type, x, y))
                     spawned_units += 1
         return spawned_units
 
+    def __deploy(self, spec, locations, num):
+        """
+        Deploys up to num information units at each location for attempt_spawn, checking each location once
+        and paying for all of the units deployed there at once.
+        """
+        deployed_units = 0
+        for location in locations:
+            if not self.can_spawn(spec.unit_type, location, 1):
+                continue
+            held = self.get_resource(spec.resource)
+            count = min(num, math.floor(held / spec.cost))
+            if count < num:
+                self.warn("Could not spawn {} at location {}. Not enough resources.".format(spec.unit_type, location))
+            x, y = map(int, location)
+            self.__set_resource(spec.resource, 0 - spec.cost * count)
+            self.game_map.add_unit(spec.unit_type, location, 0, num=count)
+            self._deploy_stack.append((spec.unit_type, x, y, count))
+            deployed_units += count
+        return deployed_units
+
     def attempt_remove(self, locations):
         """Attempts to remove existing friendly firewalls in the given locations.
 
@@ -353,7 +566,7 @@ class GameState:
         for location in locations:
             if location[1] < self.HALF_ARENA and self.contains_stationary_unit(location):
                 x, y = map(int, location)
-                self._build_stack.append((REMOVE, x, y))
+                self._build_stack.append((self.unit_specs.REMOVE, x, y))
                 removed_units += 1
             else:
                 self.warn("Could not remove a unit from {}. Location has no firewall or is enemy territory.".format(location))
@@ -395,6 +608,36 @@ class GameState:
         end_points = self.game_map.get_edge_locations(target_edge)
         return self._shortest_path_finder.navigate_multiple_endpoints(start_location, end_points, self)
 
+    def find_paths_to_edge(self, start_locations, target_edge=None):
+        """Gets the paths units at several locations would take
+
+        Start locations heading for the same edge share a single pathfinding search, so this is
+        much faster than calling find_path_to_edge for each location.
+
+        Args:
+            * start_locations: A list of locations of hypothetical units
+            * target_edge: The edge the units want to reach. game_map.TOP_LEFT, game_map.BOTTOM_RIGHT, etc. Will auto calculate for each location if None.
+
+        Returns:
+            A list with the path for each start location, in the same order. Blocked start locations get None.
+
+        """
+        paths = [None] * len(start_locations)
+        starts_by_edge = {}
+        for index, start_location in enumerate(start_locations):
+            if self.contains_stationary_unit(start_location):
+                self.warn("Attempted to perform pathing from blocked starting location {}".format(start_location))
+                continue
+            edge = self.get_target_edge(start_location) if target_edge is None else target_edge
+            starts_by_edge.setdefault(edge, []).append(index)
+
+        for edge, indices in starts_by_edge.items():
+            end_points = self.game_map.get_edge_locations(edge)
+            edge_paths = self._shortest_path_finder.navigate_multiple_starts([start_locations[i] for i in indices], end_points, self)
+            for index, path in zip(indices, edge_paths):
+                paths[index] = path
+        return paths
+
     def contains_stationary_unit(self, location):
         """Check if a location is blocked
 
@@ -408,10 +651,9 @@ class GameState:
         if not self.game_map.in_arena_bounds(location):
             self.warn('Checked for stationary unit outside of arena bounds')
             return False
-        x, y = map(int, location)
-        for unit in self.game_map[x,y]:
-            if unit.stationary:
-                return unit
+        tile = tile_of(location)
+        if self.game_map.tile_occupied[tile]:
+            return self.game_map.get_units(tile)[0]
         return False
 
     def warn(self, message):
@@ -427,7 +669,84 @@ class GameState:
         """
 
         self.enable_warnings = not suppress
-        self.game_map.enable_warnings = not suppress
+        if self.__game_map is not None:
+            self.__game_map.enable_warnings = not suppress
+
+    def fork(self):
+        """Makes a copy of the game state for trying out hypothetical moves
+
+        The copy shares the config and everything that neither state changes, including the map columns
+        (see GameMap.fork), so forking is cheap enough to branch into thousands of candidate boards per turn.
+        Spawning units on, or changing the map of, the copy does not affect this state. Forking a lazy state
+        whose map has not been built yet leaves the copy lazy too.
+
+        Returns:
+            A new game state of the same class
+
+        """
+        fork = type(self).__new__(type(self))
+        fork.__dict__.update(self.__dict__)
+        if self.__game_map is not None:
+            fork.game_map = self.__game_map.fork()
+        fork.__parsed_map = None
+        fork.__base_map = None
+        fork.__path_finder = None
+        fork.materialized = dict.fromkeys(self.materialized, 0)
+        fork._build_stack = list(self._build_stack)
+        fork._deploy_stack = list(self._deploy_stack)
+        fork._player_resources = [dict(resources) for resources in self._player_resources]
+        return fork
+
+    def _fork_parsed(self):
+        """A fork of this state as it was parsed, before any units were spawned or removed on this turn
+        """
+        fork = self.fork()
+        if self.__parsed_map is not None:
+            fork.game_map = self.__parsed_map.fork()
+        fork._build_stack = []
+        fork._deploy_stack = []
+        return fork
+
+    def checkpoint(self):
+        """Marks the current state so that later moves can be undone with rollback
+
+        Useful for depth first searches that try a move, look at the result and undo it. Changes to the map,
+        the spawn and removal queues and both players' resources are undone. Cached paths are keyed by the
+        walls on the map, so they stay correct without being undone. The map records every change from the
+        first checkpoint on until it is released with release.
+
+        Returns:
+            A checkpoint to pass to rollback
+
+        """
+        return (self.game_map.checkpoint(), len(self._build_stack), len(self._deploy_stack),
+            [dict(resources) for resources in self._player_resources])
+
+    def rollback(self, checkpoint):
+        """Undoes every change made since a checkpoint, in time proportional to the number of changes
+
+        Args:
+            * checkpoint: A checkpoint returned by checkpoint. Rolling back to a checkpoint does not invalidate
+              it, or the checkpoints taken before it
+
+        """
+        map_checkpoint, build_length, deploy_length, player_resources = checkpoint
+        self.game_map.rollback(map_checkpoint)
+        del self._build_stack[build_length:]
+        del self._deploy_stack[deploy_length:]
+        self._player_resources = [dict(resources) for resources in player_resources]
+
+    def release(self, checkpoint):
+        """Keeps every change made since a checkpoint, so the map can stop recording them
+
+        Release the first checkpoint once you are done rolling back to it, or every later change
+        to the map is recorded in case it is undone.
+
+        Args:
+            * checkpoint: A checkpoint returned by checkpoint, which can no longer be rolled back to
+
+        """
+        self.game_map.release(checkpoint[0])
 
     def get_target(self, attacking_unit):
         """Returns target of given unit based on current map of the game board. 
@@ -449,7 +768,8 @@ class GameState:
             return
 
         attacker_location = [attacking_unit.x, attacking_unit.y]
-        possible_locations = self.game_map.get_locations_in_range(attacker_location, attacking_unit.range)
+        enemy_index = 1 - attacking_unit.player_index if attacking_unit.player_index in (0, 1) else None
+        possible_targets = self.game_map.get_units_in_range(attacker_location, attacking_unit.range, player_index=enemy_index)
         target = None
         target_stationary = True
         target_distance = sys.maxsize
@@ -457,59 +777,289 @@ class GameState:
         target_y = self.ARENA_SIZE
         target_x_distance = 0
 
-        for location in possible_locations:
-            for unit in self.game_map[location]:
-                """
-                NOTE: scrambler units cannot attack firewalls so skip them if unit is firewall
-                """
-                if unit.player_index == attacking_unit.player_index or (attacking_unit.unit_type == SCRAMBLER and is_stationary(unit.unit_type)):
-                    continue
-
-                new_target = False
-                unit_stationary = unit.stationary
-                unit_distance = self.game_map.distance_between_locations(location, [attacking_unit.x, attacking_unit.y])
-                unit_stability = unit.stability
-                unit_y = unit.y
-                unit_x_distance = abs(self.HALF_ARENA - 0.5 - unit.x)
-
-                if target_stationary and not unit_stationary:
+        for unit in possible_targets:
+            """
+            NOTE: scrambler units cannot attack firewalls so skip them if unit is firewall
+            """
+            if unit.player_index == attacking_unit.player_index or (attacking_unit.unit_type == self.unit_specs.SCRAMBLER and unit.stationary):
+                continue
+
+            new_target = False
+            unit_stationary = unit.stationary
+            unit_distance = self.game_map.distance_between_locations([unit.x, unit.y], attacker_location)
+            unit_stability = unit.stability
+            unit_y = unit.y
+            unit_x_distance = abs(self.HALF_ARENA - 0.5 - unit.x)
+
+            if target_stationary and not unit_stationary:
+                new_target = True
+            elif not target_stationary and unit_stationary:
+                continue
+            
+            if target_distance > unit_distance:
+                new_target = True
+            elif target_distance < unit_distance and not new_target:
+                continue
+
+            if target_stability > unit_stability:
+                new_target = True
+            elif target_stability < unit_stability and not new_target:
+                continue
+
+            # Compare height heuristic relative to attacking unit's player index
+            if attacking_unit.player_index == 0:
+                if target_y > unit_y:
                     new_target = True
-                elif not target_stationary and unit_stationary:
+                elif target_y < unit_y and not new_target:
                     continue
-                
-                if target_distance > unit_distance:
+            else:
+                if target_y < unit_y:
                     new_target = True
-                elif target_distance < unit_distance and not new_target:
+                elif target_y > unit_y and not new_target:
                     continue
 
-                if target_stability > unit_stability:
-                    new_target = True
-                elif target_stability < unit_stability and not new_target:
-                    continue
+            if target_x_distance < unit_x_distance:
+                new_target = True
+            
+            if new_target:
+                target = unit
+                target_stationary = unit_stationary
+                target_distance = unit_distance
+                target_stability = unit_stability
+                target_y = unit_y
+                target_x_distance = unit_x_distance
+        return target
 
-                # Compare height heuristic relative to attacking unit's player index
-                if attacking_unit.player_index == 0:
-                    if target_y > unit_y:
-                        new_target = True
-                    elif target_y < unit_y and not new_target:
-                        continue
+    def get_targets(self, attacking_units):
+        """Returns the target of each of many units, like calling get_target for each of them but faster
+
+        The priority of each unit that could be attacked is worked out once for the whole batch, as a key that sorts
+        like the targeting priority of get_target, leaving only the distance to each attacker to compute. The enemy
+        units in range of an attacker are read from the bitboards of the map.
+
+        Args:
+            * attacking_units: A list of GameUnits
+
+        Returns:
+            A list with the GameUnit each unit would choose to attack, or None, in the same order
+
+        """
+        game_map = self.game_map
+        unit_specs = self.unit_specs
+        x_center = self.HALF_ARENA - 0.5
+        boards = {}
+        candidates = {}
+        targets = []
+        for attacking_unit in attacking_units:
+            if not isinstance(attacking_unit, GameUnit) or attacking_unit.player_index not in (0, 1):
+                targets.append(self.get_target(attacking_unit))
+                continue
+            tile = tile_of([attacking_unit.x, attacking_unit.y])
+            if tile == -1:
+                targets.append(self.get_target(attacking_unit))
+                continue
+
+            enemy_index = 1 - attacking_unit.player_index
+            scrambler = attacking_unit.unit_type == unit_specs.SCRAMBLER
+            board = boards.get((enemy_index, scrambler))
+            if board is None:
+                if scrambler:
+                    # Scramblers cannot attack firewalls, so only look at information units
+                    board = 0
+                    for spec in unit_specs.specs:
+                        if not spec.stationary:
+                            board |= game_map.get_bitboard(spec.unit_type, enemy_index)
                 else:
-                    if target_y < unit_y:
-                        new_target = True
-                    elif target_y > unit_y and not new_target:
+                    board = game_map.get_bitboard(None, enemy_index)
+                boards[(enemy_index, scrambler)] = board
+
+            x, y = attacking_unit.x, attacking_unit.y
+            y_sign = 1 if attacking_unit.player_index == 0 else -1
+            target = None
+            target_key = None
+            for candidate_tile in tiles(board & range_mask(tile, attacking_unit.range)):
+                tile_candidates = candidates.get(candidate_tile)
+                if tile_candidates is None:
+                    unit_x, unit_y = TILE_LOCATIONS[candidate_tile]
+                    # Everything but the distance: stationary units last, then lowest stability, then the y coordinate,
+                    # then furthest from the center, then the order get_target would see the units in
+                    tile_candidates = [(unit, unit.player_index, unit.stationary, unit.stability, unit_x, unit_y,
+                        -abs(x_center - unit_x), X_MAJOR_RANK[candidate_tile]) for unit in game_map.get_units(candidate_tile)]
+                    candidates[candidate_tile] = tile_candidates
+                for unit, player_index, stationary, stability, unit_x, unit_y, x_distance, rank in tile_candidates:
+                    if player_index != enemy_index or (scrambler and stationary):
                         continue
+                    key = (stationary, (unit_x - x)**2 + (unit_y - y)**2, stability, y_sign * unit_y, x_distance, rank)
+                    if target_key is None or key < target_key:
+                        target = unit
+                        target_key = key
+            targets.append(target)
+        return targets
 
-                if target_x_distance < unit_x_distance:
-                    new_target = True
-                
-                if new_target:
-                    target = unit
-                    target_stationary = unit_stationary
-                    target_distance = unit_distance
-                    target_stability = unit_stability
-                    target_y = unit_y
-                    target_x_distance = unit_x_distance
-        return target
+    def get_threat_map(self, player_index=0):
+        """Gets the damage per frame enemy destructors deal to a unit of the given player on each tile
+
+        Built from GameMap.get_attacker_counts, which is kept up to date as units are spawned and removed.
+
+        Args:
+            * player_index: The index corresponding to the player whose units are attacked, 0 for you 1 for the enemy
+
+        Returns:
+            A list of damages indexed by tile id, see gamelib.geometry. The damage at a location is
+            len(get_attackers(location, player_index)) times the damage of a destructor
+
+        """
+        damage = self.unit_specs.by_type[self.unit_specs.DESTRUCTOR].damage
+        return [count * damage for count in self.game_map.get_attacker_counts(player_index)]
+
+    def get_path_damage(self, path, player_index=0):
+        """Gets the damage per frame enemy destructors deal to a unit of the given player summed along a path
+
+        Args:
+            * path: A list of locations, such as one returned by find_path_to_edge
+            * player_index: The index corresponding to the player whose unit follows the path, 0 for you 1 for the enemy
+
+        Returns:
+            The sum over the locations of the path of the damage a unit would take there each frame
+
+        """
+        counts = self.game_map.get_attacker_counts(player_index)
+        attackers = 0
+        for location in path:
+            tile = tile_of(location)
+            if tile != -1:
+                attackers += counts[tile]
+        return attackers * self.unit_specs.by_type[self.unit_specs.DESTRUCTOR].damage
+
+    def estimate_survivors(self, location, unit_type, num=1, player_index=0):
+        """Estimates how many information units deployed together at a location would reach the enemy edge
+
+        A closed form stand in for simulate_action_phase, cheap enough to score every spawn location, unit type
+        and count before simulating the best few. Every enemy destructor in range of a tile of the path shoots the
+        front unit of the group once for each frame the group spends on the tile, which is 1/speed frames, and a
+        unit dies after enough shots to take its stability. Encryptors add their shield to the stability of each
+        unit they reach, less the decay between the frame it is picked up and the average frame of the shots after it.
+        The units are assumed to destroy no firewalls, so the estimate errs low against weak defenses. Units whose
+        path does not reach the edge never survive.
+
+        The path and the threats along it are kept for each layout of walls, destructors and encryptors, so later
+        estimates from the same location, including on forks and later turns with the same layout, only take microseconds.
+
+        Args:
+            * location: The location the units are deployed at
+            * unit_type: The type of the units, PING, EMP or SCRAMBLER
+            * num: The number of units deployed
+            * player_index: The index corresponding to the player deploying the units, 0 for you 1 for the enemy
+
+        Returns:
+            The number of units expected to reach the edge, from 0 to num
+
+        """
+        if unit_type not in self.unit_specs.by_type:
+            self._invalid_unit(unit_type)
+            return 0
+        spec = self.unit_specs.by_type[unit_type]
+        tile = tile_of(location)
+        if tile == -1 or spec.stationary:
+            return 0
+        route = self.__route_threats(tile, player_index)
+        if route is None:
+            return 0
+        estimates = route[2]
+        estimate = estimates.get(unit_type)
+        if estimate is None:
+            estimate = self.__estimate_route(route, spec)
+            estimates[unit_type] = estimate
+        shots, shots_per_unit = estimate
+        if shots_per_unit == 0:
+            return num
+        return max(0, num - shots // shots_per_unit)
+
+    def __route_threats(self, tile, player_index):
+        """
+        Gets the destructors in range of each step of the path from a tile to the edge up to the step it breaches on,
+        and the step each encryptor is first in range on, with a dict for estimates made from them. None when the path
+        does not reach the edge. Kept in _layout_caches, keyed by everything they depend on.
+        """
+        game_map = self.game_map
+        unit_specs = self.unit_specs
+        key = (tile, player_index, game_map.walls, game_map.get_bitboard(unit_specs.DESTRUCTOR, 1 - player_index),
+            game_map.get_bitboard(unit_specs.ENCRYPTOR, player_index))
+        routes = self._layout_caches.setdefault("survivors", {})
+        if key in routes:
+            return routes[key]
+        if len(routes) >= 4096:
+            routes.clear()
+
+        route = None
+        location = list(TILE_LOCATIONS[tile])
+        if not game_map.tile_occupied[tile]:
+            edge = self.get_target_edge(location)
+            path = self._shortest_path_finder.navigate_multiple_endpoints(location, game_map.get_edge_locations(edge), self)
+            steps = [tile_of(step) for step in path]
+            end = next((step for step in range(1, len(steps)) if TILE_LOCATIONS[steps[step]] in EDGE_LOCATION_SETS[edge]), None)
+            if end is not None:
+                counts = game_map.get_attacker_counts(player_index)
+                attackers = [counts[step] for step in steps[:end]]
+                encryptor_range = unit_specs.by_type[unit_specs.ENCRYPTOR].range
+                pickups = []
+                for encryptor in tiles(key[4]):
+                    reach = range_mask(encryptor, encryptor_range)
+                    first = next((step for step in range(end) if reach >> steps[step] & 1), None)
+                    if first is not None:
+                        pickups.append(first)
+                route = (attackers, pickups, {})
+        routes[key] = route
+        return route
+
+    def __estimate_route(self, route, spec):
+        """
+        Works out the shots a group of units of one type takes along a route, and the shots it takes to kill one of them.
+        """
+        attackers, pickups, _ = route
+        frames_per_step = round(1 / spec.speed)
+        mechanics = self.config["mechanics"]
+        encryptor = self.unit_specs.by_type[self.unit_specs.ENCRYPTOR]
+        damage = self.unit_specs.by_type[self.unit_specs.DESTRUCTOR].damage
+
+        # Units on step i are shot from frame i * frames_per_step, except on the spawn tile, where the first frame is spent spawning
+        shots = 0
+        for step, count in enumerate(attackers):
+            shots += count * (frames_per_step - 1 if step == 0 else frames_per_step)
+
+        stability = spec.max_stability
+        for pickup in pickups:
+            picked_up = pickup * frames_per_step + 1
+            later_shots = 0
+            shot_frames = 0
+            for step in range(pickup, len(attackers)):
+                first = max(step * frames_per_step, picked_up)
+                frames = (step + 1) * frames_per_step - first
+                later_shots += attackers[step] * frames
+                shot_frames += attackers[step] * frames * (first + (frames - 1) / 2)
+            if later_shots:
+                decayed = mechanics.get("shieldDecayPerFrame", 0) * (shot_frames / later_shots - picked_up)
+                stability += max(0, encryptor.damage - decayed)
+        return shots, math.ceil(stability / damage) if damage > 0 else 0
+
+    def simulate_action_phase(self, enemy_build_stack=(), enemy_deploy_stack=(), record=True):
+        """Plays out the action phase of this turn locally, see ActionSimulator
+
+        The action phase starts from the board of the turn, as it was parsed, with the units you spawned and removed
+        with attempt_spawn and attempt_remove. To try many deployments against the same board, create an ActionSimulator
+        from _fork_parsed() once and run each deployment with it instead.
+
+        Args:
+            * enemy_build_stack: The stationary units your opponent builds, as (unit_type, x, y) entries
+            * enemy_deploy_stack: The information units your opponent deploys, as (unit_type, x, y, count) entries
+            * record: If false, no frames are recorded, which is faster when only the outcome is needed
+
+        Returns:
+            A SimulationResult with the board at the end of the action phase and its action frames
+
+        """
+        simulator = ActionSimulator(self._fork_parsed())
+        return simulator.run(self._build_stack, self._deploy_stack, enemy_build_stack, enemy_deploy_stack, record)
 
     def get_attackers(self, location, player_index):
         """Gets the destructors threatening a given location
@@ -530,11 +1080,11 @@ class GameState:
 
         attackers = []
         """
-        Get locations in the range of DESTRUCTOR units
+        Get the enemy DESTRUCTOR units in range from the bitboards of the map
         """
-        possible_locations= self.game_map.get_locations_in_range(location, self.config["unitInformation"][UNIT_TYPE_TO_INDEX[DESTRUCTOR]]["range"])
-        for location in possible_locations:
-            for unit in self.game_map[location]:
-                if unit.unit_type == DESTRUCTOR and unit.player_index != player_index:
-                    attackers.append(unit)
+        destructor = self.unit_specs.by_type[self.unit_specs.DESTRUCTOR]
+        enemy_index = 1 - player_index if player_index in (0, 1) else None
+        for unit in self.game_map.get_units_in_range(location, destructor.range, destructor.unit_type, enemy_index):
+            if unit.player_index != player_index:
+                attackers.append(unit)
         return attackers
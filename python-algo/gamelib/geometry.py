@@ -0,0 +1,168 @@
+"""
+Static geometry of the diamond shaped arena, computed once at import.
+
+Tiles inside the arena are numbered row by row from the bottom, in the same order that iterating over a
+GameMap visits them. Most of gamelib indexes flat arrays by these tile ids instead of using [x, y] pairs.
+"""
+
+import math
+
+ARENA_SIZE = 28
+HALF_ARENA = 14
+
+TOP_RIGHT = 0
+TOP_LEFT = 1
+BOTTOM_LEFT = 2
+BOTTOM_RIGHT = 3
+
+#The direction of each edge from the center of the board, as [x, y]
+EDGE_DIRECTIONS = ((1, 1), (-1, 1), (-1, -1), (1, -1))
+
+def _build_tiles():
+    in_arena = [[False] * ARENA_SIZE for _ in range(ARENA_SIZE)]
+    tile_id = [[-1] * ARENA_SIZE for _ in range(ARENA_SIZE)]
+    locations = []
+    for y in range(ARENA_SIZE):
+        row_size = y + 1 if y < HALF_ARENA else ARENA_SIZE - y
+        for x in range(HALF_ARENA - row_size, HALF_ARENA + row_size):
+            in_arena[x][y] = True
+            tile_id[x][y] = len(locations)
+            locations.append((x, y))
+    return in_arena, tile_id, tuple(locations)
+
+def _build_neighbors():
+    neighbors = []
+    for x, y in TILE_LOCATIONS:
+        adjacent = []
+        for nx, ny in [(x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)]:
+            if (nx, ny) in ARENA_LOCATIONS:
+                adjacent.append(TILE_ID[nx][ny])
+        neighbors.append(tuple(adjacent))
+    return tuple(neighbors)
+
+def _build_edges():
+    top_right = tuple((HALF_ARENA + num, ARENA_SIZE - 1 - num) for num in range(HALF_ARENA))
+    top_left = tuple((HALF_ARENA - 1 - num, ARENA_SIZE - 1 - num) for num in range(HALF_ARENA))
+    bottom_left = tuple((HALF_ARENA - 1 - num, num) for num in range(HALF_ARENA))
+    bottom_right = tuple((HALF_ARENA + num, num) for num in range(HALF_ARENA))
+    return (top_right, top_left, bottom_left, bottom_right)
+
+def _build_idealness(direction):
+    """How much a unit heading for the edge in direction wants to reach each tile, see ShortestPathFinder._get_idealness
+    """
+    idealness = []
+    for x, y in TILE_LOCATIONS:
+        value = 28 * y if direction[1] == 1 else 28 * (27 - y)
+        value += x if direction[0] == 1 else 27 - x
+        idealness.append(value)
+    return tuple(idealness)
+
+#IN_ARENA[x][y] is True for locations inside the arena
+#TILE_ID[x][y] is the tile id of a location, or -1 outside of the arena
+#TILE_LOCATIONS[tile] is the (x, y) of a tile id
+IN_ARENA, TILE_ID, TILE_LOCATIONS = _build_tiles()
+ARENA_TILES = len(TILE_LOCATIONS)
+ARENA_LOCATIONS = frozenset(TILE_LOCATIONS)
+#HALF_LOCATIONS[player_index] holds the locations in a player's half of the arena, player 0 owns the bottom half
+HALF_LOCATIONS = (TILE_LOCATIONS[:ARENA_TILES // 2], TILE_LOCATIONS[ARENA_TILES // 2:])
+TILE_X = tuple(x for x, _ in TILE_LOCATIONS)
+TILE_Y = tuple(y for _, y in TILE_LOCATIONS)
+#X_MAJOR_RANK[tile] is the position of a tile when sorting the arena by x then y, the order get_locations_in_range uses
+def _build_x_major_rank():
+    rank = [0] * ARENA_TILES
+    for position, tile in enumerate(sorted(range(ARENA_TILES), key=TILE_LOCATIONS.__getitem__)):
+        rank[tile] = position
+    return tuple(rank)
+
+X_MAJOR_RANK = _build_x_major_rank()
+
+#NEIGHBORS[tile] holds the in bounds neighbors of a tile in the order up, down, right, left
+NEIGHBORS = _build_neighbors()
+
+#EDGES[edge] holds the (x, y) of each location on an edge, in the order GameMap.get_edges returns them
+EDGES = _build_edges()
+EDGE_TILES = tuple(tuple(TILE_ID[x][y] for x, y in edge) for edge in EDGES)
+EDGE_LOCATION_SETS = tuple(frozenset(edge) for edge in EDGES)
+
+#IDEALNESS[edge][tile] is the idealness of a tile for units heading for an edge
+IDEALNESS = tuple(_build_idealness(direction) for direction in EDGE_DIRECTIONS)
+
+def tile_of(location):
+    """Gets the tile id of a location
+
+    Args:
+        * location: A map location
+
+    Returns:
+        The tile id, or -1 if the location is outside of the arena
+
+    """
+    x, y = location
+    if (x, y) in ARENA_LOCATIONS:
+        return TILE_ID[int(x)][int(y)]
+    return -1
+
+_STENCILS = {}
+_TILES_IN_RANGE = {}
+
+def range_stencil(radius):
+    """Gets the offsets of the locations in range of a location, see GameMap.get_locations_in_range
+
+    Args:
+        * radius: The radius of the search area
+
+    Returns:
+        A tuple of (dx, dy) offsets, in the order GameMap.get_locations_in_range visits them
+
+    """
+    stencil = _STENCILS.get(radius)
+    if stencil is None:
+        # The box GameMap.get_locations_in_range used to scan reaches ceil(radius) below a location but only floor(radius) above
+        offsets = range(-math.ceil(radius), math.floor(radius) + 1)
+        # A unit with a given range affects all locations who's centers are within that range + 0.51
+        stencil = tuple((dx, dy) for dx in offsets for dy in offsets if math.sqrt(dx**2 + dy**2) < radius + 0.51)
+        _STENCILS[radius] = stencil
+    return stencil
+
+def tiles_in_range(tile, radius):
+    """Gets the tiles in range of a tile, computing them once for each tile and radius
+
+    Args:
+        * tile: The tile id at the center of the search area
+        * radius: The radius of the search area
+
+    Returns:
+        A tuple of tile ids, in the order GameMap.get_locations_in_range returns their locations
+
+    """
+    key = (tile, radius)
+    in_range = _TILES_IN_RANGE.get(key)
+    if in_range is None:
+        x, y = TILE_LOCATIONS[tile]
+        in_range = tuple(TILE_ID[x + dx][y + dy] for dx, dy in range_stencil(radius) if (x + dx, y + dy) in ARENA_LOCATIONS)
+        _TILES_IN_RANGE[key] = in_range
+    return in_range
+
+_TILES_REACHING = {}
+
+def tiles_reaching(tile, radius):
+    """Gets the tiles whose tiles_in_range include a tile, computing them once for each tile and radius
+
+    The range stencil is not symmetric, so these are not always the tiles in range of the tile.
+    A destructor on the tile attacks units on exactly these tiles, see GameState.get_attackers.
+
+    Args:
+        * tile: The tile id of the tile being reached
+        * radius: The radius of the search area
+
+    Returns:
+        A tuple of tile ids
+
+    """
+    key = (tile, radius)
+    reaching = _TILES_REACHING.get(key)
+    if reaching is None:
+        x, y = TILE_LOCATIONS[tile]
+        reaching = tuple(TILE_ID[x - dx][y - dy] for dx, dy in range_stencil(radius) if (x - dx, y - dy) in ARENA_LOCATIONS)
+        _TILES_REACHING[key] = reaching
+    return reaching
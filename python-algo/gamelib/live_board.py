@@ -0,0 +1,163 @@
+from .util import load_state
+from .geometry import tile_of
+
+def unit_ids(game_map, state):
+    """Maps the id of each unit in the unit lists of a turn to the unit on a board built from that turn
+
+    Units of the lists that are not on the board, with the same type and owner, are left out.
+
+    Args:
+        * game_map (:obj: GameMap): A board holding the units of the turn
+        * state (dict): The decoded game state of the turn
+
+    Returns:
+        A dict mapping unit ids to units of game_map
+
+    """
+    unit_specs = game_map.unit_specs
+    units_by_id = {}
+    mobile_seen = {}
+    for player_index, units in enumerate((state["p1Units"], state["p2Units"])):
+        for i, unit_types in enumerate(units[:len(unit_specs.specs)]):
+            spec = unit_specs.specs[i]
+            for uinfo in unit_types:
+                if len(uinfo) < 4:
+                    continue
+                tile = tile_of([int(uinfo[0]), int(uinfo[1])])
+                if tile == -1:
+                    continue
+                on_tile = [unit for unit in game_map.get_units(tile)
+                    if unit.unit_type == spec.unit_type and unit.player_index == player_index]
+                if spec.stationary:
+                    if on_tile:
+                        units_by_id[uinfo[3]] = on_tile[0]
+                else:
+                    # Information units are on their tile in the order they are listed
+                    key = (tile, i, player_index)
+                    index = mobile_seen.get(key, 0)
+                    if index < len(on_tile):
+                        units_by_id[uinfo[3]] = on_tile[index]
+                    mobile_seen[key] = index + 1
+    return units_by_id
+
+class LiveBoard:
+    """Keeps a copy of the board up to date through the action phase by applying the events of each action frame
+
+    Create it in on_turn from the turn's GameState, then pass every action frame to apply_frame. Only the events
+    of a frame are read, so the board is never rebuilt from the unit lists of a frame. Units spawned with
+    attempt_spawn on the turn are left out, as the first frame of the action phase spawns them.
+
+    Attributes:
+        * game_state (:obj: GameState): A fork of the turn's game state holding the board as of the last frame applied.
+          The health and resources of both players are read from the stats of each frame
+        * frame (int): The number of the last frame applied, -1 before the first one
+
+    """
+    def __init__(self, game_state):
+        """Starts from the board as it was at the start of the turn
+
+        Args:
+            * game_state (:obj: GameState): The game state of the turn, as passed to on_turn
+
+        """
+        self.game_state = game_state._fork_parsed()
+        self.frame = -1
+        self.__removed = set()
+        self.__units = unit_ids(self.game_state.game_map, load_state(game_state.serialized_string))
+
+    def __find(self, unit_id, location, type_index=None, player=None):
+        """
+        Gets the unit with an id, falling back on a unit of the same type and player at the location for units
+        the board has not seen before, or any unit at the location when they are not given. None if the unit
+        is no longer on the board.
+        """
+        unit = self.__units.get(unit_id)
+        if unit is not None or unit_id in self.__removed:
+            return unit
+        game_map = self.game_state.game_map
+        unit_type = None if type_index is None else game_map.unit_types[type_index]
+        for unit in game_map[location] or []:
+            if (unit_type is None or unit.unit_type == unit_type) and (player is None or unit.player_index == player - 1):
+                self.__units[unit_id] = unit
+                return unit
+        return None
+
+    def apply_frame(self, frame):
+        """Updates the board with the events of an action frame
+
+        Args:
+            * frame: The action frame passed to on_action_frame, as a string, GameMessage or decoded dict
+
+        """
+        state = load_state(frame)
+        game_state = self.game_state
+        game_map = game_state.game_map
+        unit_types = game_map.unit_types
+        remove_index = game_map.unit_specs.type_index[game_map.unit_specs.REMOVE]
+        events = state.get("events", {})
+
+        for location, type_index, unit_id, player in (event[:4] for event in events.get("spawn", [])):
+            if type_index == remove_index:
+                units = game_map[location]
+                if units and units[0].stationary:
+                    units[0].pending_removal = True
+            elif game_map.in_arena_bounds(location):
+                self.__units[unit_id] = game_map.add_unit(unit_types[type_index], location, player - 1)
+        # The type in a shield event is the encryptor's, so the shielded unit is found by its id and location
+        for event in events.get("shield", []):
+            unit = self.__find(event[5], event[1])
+            if unit is not None:
+                unit.stability += event[2]
+        for event in events.get("move", []):
+            unit = self.__find(event[4], event[0], event[3], event[5])
+            if unit is not None:
+                game_map.move_unit(unit, event[1])
+        for location, damage, type_index, unit_id, player in (event[:5] for event in events.get("damage", [])):
+            unit = self.__find(unit_id, location, type_index, player)
+            if unit is not None:
+                unit.stability -= damage
+        removals = [event[:4] for event in events.get("death", [])]
+        # Units that breach leave the board too
+        removals += [(event[0],) + tuple(event[2:5]) for event in events.get("breach", [])]
+        for location, type_index, unit_id, player in removals:
+            unit = self.__find(unit_id, location, type_index, player)
+            if unit is not None:
+                game_map.delete_unit(unit)
+                del self.__units[unit_id]
+                self.__removed.add(unit_id)
+
+        p1_health, p1_cores, p1_bits = map(float, state["p1Stats"][:3])
+        p2_health, p2_cores, p2_bits = map(float, state["p2Stats"][:3])
+        game_state.my_health = p1_health
+        game_state.enemy_health = p2_health
+        game_state._player_resources = [
+            {'cores': p1_cores, 'bits': p1_bits},
+            {'cores': p2_cores, 'bits': p2_bits}]
+        self.frame = int(state["turnInfo"][2])
+
+    def predict_next_turn(self):
+        """Predicts the board at the start of the next turn from the current board
+
+        Information units are left out, as they all leave the board during the action phase, and so are
+        stationary units pending removal. Bits are projected with project_future_bits and each player gains
+        coresPerRound cores. Refunds for removed units are not counted.
+
+        Returns:
+            A new GameState for the next turn
+
+        """
+        prediction = self.game_state.fork()
+        game_map = prediction.game_map
+        for tile in list(game_map.mobile_units):
+            for unit in game_map.get_units(tile):
+                if not unit.stationary:
+                    game_map.delete_unit(unit)
+        for unit in list(game_map.stationary_units()):
+            if unit.pending_removal:
+                game_map.delete_unit(unit)
+        resources = prediction.config["resources"]
+        for player_index, player_resources in enumerate(prediction._player_resources):
+            player_resources['bits'] = prediction.project_future_bits(1, player_index)
+            player_resources['cores'] += resources["coresPerRound"]
+        prediction.turn_number += 1
+        return prediction
@@ -1,24 +1,147 @@
 import heapq
-import math
 import sys
-import queue
+from collections import deque, OrderedDict
 from .util import debug_write
+from .bitboard import tiles
+from .geometry import ARENA_SIZE, HALF_ARENA, ARENA_TILES, TILE_ID, TILE_X, TILE_Y, TILE_LOCATIONS, NEIGHBORS, \
+    EDGE_DIRECTIONS, EDGE_TILES, IDEALNESS, tile_of
 
-class Node:
-    """A pathfinding node
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_CLEAR = bytes(ARENA_TILES)
+_UNREACHED = [-1] * ARENA_TILES
+
+def field_to_grid(field):
+    """Lays a field indexed by tile id out on the board
+
+    Args:
+        * field: A list with one value per tile id, like a pathlength field
+
+    Returns:
+        A list of columns so that grid[x][y] is the value at location [x, y], -1 outside of the arena
+
+    """
+    grid = [[-1] * ARENA_SIZE for _ in range(ARENA_SIZE)]
+    for tile, value in enumerate(field):
+        grid[TILE_X[tile]][TILE_Y[tile]] = value
+    return grid
+
+def _edge_fields_numpy(blocked, edge_tiles):
+    """Breadth first search from several edges at once using array operations
+
+    Each edge gets one row holding the whole board, padded by a tile on every side and flattened so that
+    the neighbors of every tile are plain slices of the row.
+
+    Args:
+        * blocked: 1 for each tile id holding a firewall
+        * edge_tiles: The tile ids of each edge
+
+    Returns:
+        A pathlength field for each edge, matching what ShortestPathFinder._validate finds for it
+
+    """
+    width = ARENA_SIZE + 2
+    flat = (np.array(TILE_X) + 1) * width + np.array(TILE_Y) + 1
+    passable = np.zeros(width * width, dtype=bool)
+    passable[flat] = np.frombuffer(bytes(blocked), dtype=np.uint8) == 0
+
+    seeds = np.zeros((len(edge_tiles), width * width), dtype=bool)
+    for edge, tiles in enumerate(edge_tiles):
+        seeds[edge, flat[list(tiles)]] = True
+    #Blocked edge tiles count as reached but nothing can path through them
+    frontier = seeds & passable
+    unvisited = passable & ~frontier
+
+    #A tile reached on step n stays unvisited for n steps, so counting those steps gives its pathlength
+    pathlength = np.zeros(seeds.shape, dtype=np.int32)
+    reached = np.zeros(seeds.shape, dtype=bool)
+    while True:
+        inner = reached[:, width:-width]
+        np.logical_or(frontier[:, width - 1:-width - 1], frontier[:, width + 1:-width + 1], out=inner)
+        inner |= frontier[:, :-2 * width]
+        inner |= frontier[:, 2 * width:]
+        inner &= unvisited[:, width:-width]
+        if not inner.any():
+            break
+        pathlength += unvisited
+        unvisited ^= reached
+        frontier, reached = reached, frontier
+
+    pathlength[unvisited | ~passable] = -1
+    pathlength[seeds] = 0
+    return pathlength[:, flat].tolist()
+
+class WallLayout:
+    """The pathing data for one arrangement of firewalls
 
     Attributes:
-        * visited_idealness (bool): Have we visited this node during the idealness search step?
-        * visited_validate (bool): Have we visited this node during the validation step?
-        * blocked (bool): Is there a firewall at this node's location
-        * pathlength: The distance between this node and the target location
+        * blocked (bytes): 1 for each tile id holding a firewall
+        * fields (dict): Maps the tile ids of a set of end points to the pathlength fields computed for them so far,
+          one for each pocket of pathable space that has been searched
 
     """
-    def __init__(self):
-        self.visited_idealness = False
-        self.visited_validate = False
-        self.blocked = False
-        self.pathlength = -1
+    def __init__(self, blocked):
+        self.blocked = blocked
+        self.fields = {}
+
+class PathCache:
+    """A bounded least recently used cache of WallLayouts, keyed by the walls bitboard of a GameMap
+
+    Boards with the same firewall layout share one entry, so each pathlength field is only searched once.
+    GameMap updates its walls bitboard in add_unit and remove_unit, so a changed board never reads a stale entry.
+
+    Attributes:
+        * max_size (int): The most layouts to keep before evicting the least recently used one
+        * hits (int): The number of lookups that found their layout
+        * misses (int): The number of lookups for a layout that was not cached
+
+    """
+    def __init__(self, max_size=64):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._layouts = OrderedDict()
+
+    def __len__(self):
+        return len(self._layouts)
+
+    def lookup(self, key):
+        """Gets the layout stored under a walls bitboard
+
+        Returns:
+            The WallLayout, or None if it is not cached
+
+        """
+        layout = self._layouts.get(key)
+        if layout is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._layouts.move_to_end(key)
+        return layout
+
+    def store(self, key, blocked):
+        """Adds a layout, evicting the least recently used one if the cache is full
+
+        Returns:
+            The new WallLayout
+
+        """
+        layout = WallLayout(blocked)
+        self._layouts[key] = layout
+        if len(self._layouts) > self.max_size:
+            self._layouts.popitem(last=False)
+        return layout
+
+    def clear(self):
+        """Empties the cache and resets the counters
+        """
+        self._layouts.clear()
+        self.hits = 0
+        self.misses = 0
 
 """
 This class helps with pathfinding. We guarantee the results will
@@ -28,29 +151,41 @@ code to maximise time efficiency
 class ShortestPathFinder:
     """Handles pathfinding
 
+    All search state lives in flat arrays indexed by tile id (see TILE_ID), so searches never build
+    per-tile objects. Walls and pathlength fields are shared through a PathCache, by default one shared
+    by every ShortestPathFinder so that repeated layouts are reused across turns.
+
     Attributes:
         * HORIZONTAL (int): A constant representing a horizontal movement
         * VERTICAL (int): A constant representing a vertical movement
 
         * game_state (:obj: GameState): The current gamestate
-        * game_map (:obj: GameMap): The current gamemap
+        * blocked (bytes): 1 for each tile id holding a firewall
+        * pathlength (list): The distance between each tile id and the target location in the most recent search, -1 if it was not reached
+        * cache (:obj: PathCache): The cache of wall layouts and pathlength fields
 
     """
+    cache = PathCache()
+
     def __init__(self):
         self.HORIZONTAL = 1
         self.VERTICAL = 2
         self.initialized = False
+        self.blocked = _CLEAR
+        self.pathlength = list(_UNREACHED)
+        self._visited = bytearray(ARENA_TILES)
 
     def initialize_map(self, game_state):
         """Initializes the map
 
         Args:
-            * game_state: A GameState object representing the gamestate we want to 
+            * game_state: A GameState object representing the gamestate we want to
         """
-        #Initialize map 
+        #Initialize map
         self.initialized = True
         self.game_state = game_state
-        self.game_map = [[Node() for x in range(self.game_state.ARENA_SIZE)] for y in range(self.game_state.ARENA_SIZE)]
+        self.blocked = _CLEAR
+        self.pathlength = list(_UNREACHED)
 
     def navigate_multiple_endpoints(self, start_point, end_points, game_state):
         """Finds the path a unit would take to reach a set of endpoints
@@ -67,59 +202,159 @@ class ShortestPathFinder:
         """
         if game_state.contains_stationary_unit(start_point):
             return
+        return self.navigate_multiple_starts([start_point], end_points, game_state)[0]
+
+    def navigate_multiple_starts(self, start_points, end_points, game_state):
+        """Finds the paths units at several locations would take to reach the same set of endpoints
+
+        The walls are read once, and a single pathlength field is computed for each pocket of pathable space
+        the start points are in. Every start point that can reach the edge shares the same field, so this is
+        much cheaper than calling navigate_multiple_endpoints once per start point.
+
+        Args:
+            * start_points: A list of starting locations
+            * end_points: The end points of the units, should be a list of edge locations
+            * game_state: The current game state
 
-        #Initialize map 
+        Returns:
+            A list with the path for each start point, in the same order. Start points that are blocked
+            or outside of the arena get None instead of a path.
+
+        """
+        #Initialize map
         self.initialize_map(game_state)
-        #Fill in walls
-        for location in self.game_state.game_map:
-            if self.game_state.contains_stationary_unit(location):
-                self.game_map[location[0]][location[1]].blocked = True
+        layout = self._load_walls(game_state)
+        blocked = self.blocked
         #Do pathfinding
-        ideal_endpoints = self._idealness_search(start_point, end_points)
-        self._validate(ideal_endpoints, end_points)
-        return self._get_path(start_point, end_points)
+        self._set_end_points(end_points)
+        fields = layout.fields.setdefault(self._end_tiles, [])
+        paths = []
+        for start_point in start_points:
+            start = tile_of(start_point)
+            if start == -1 or blocked[start]:
+                paths.append(None)
+                continue
+
+            #A start point reached by an existing field shares its pocket, and so its most ideal tile
+            for pathlength in fields:
+                if not pathlength[start] == -1:
+                    break
+            else:
+                ideal_tile = self._idealness_search(start)
+                pathlength = self._validate(ideal_tile)
+                fields.append(pathlength)
+
+            self.pathlength = pathlength
+            paths.append(self._get_path(start_point, start))
+        return paths
+
+    def edge_fields(self, game_state, vectorized=False):
+        """Finds the distance from every tile to each of the four edges
+
+        The fields are stored in the path cache, so pathing on the same board afterwards only has to walk them.
+
+        Args:
+            * game_state: The current game state
+            * vectorized: Search all four edges at once with NumPy array operations instead of visiting tiles one
+              at a time. The results are the same. On a single board the overhead of each array operation makes
+              this slower than the tile search, so it is off by default. Ignored if NumPy is not installed.
+
+        Returns:
+            A list of four pathlength fields indexed by tile id, in the order of the GameMap edge constants
+            (TOP_RIGHT, TOP_LEFT, BOTTOM_LEFT, BOTTOM_RIGHT). Tiles that cannot reach the edge are -1.
+            Use field_to_grid to lay a field out on the board.
 
-    def _idealness_search(self, start, end_points):
         """
-        Finds the most ideal tile in our 'pocket' of pathable space. 
+        self.initialize_map(game_state)
+        layout = self._load_walls(game_state)
+        edge_tiles = EDGE_TILES
+
+        #Reuse any edge fields this layout already has, which are the ones with a pathlength of 0 on the edge
+        result = [None] * len(edge_tiles)
+        for edge, tiles in enumerate(edge_tiles):
+            for pathlength in layout.fields.get(tiles, []):
+                if pathlength[tiles[0]] == 0:
+                    result[edge] = pathlength
+                    break
+
+        missing = [edge for edge in range(len(edge_tiles)) if result[edge] is None]
+        if missing and vectorized and np is not None:
+            new_fields = _edge_fields_numpy(self.blocked, [edge_tiles[edge] for edge in missing])
+        else:
+            new_fields = []
+            for edge in missing:
+                self._set_end_points([TILE_LOCATIONS[tile] for tile in edge_tiles[edge]])
+                new_fields.append(self._validate(self._end_tiles[0]))
+        for edge, pathlength in zip(missing, new_fields):
+            layout.fields.setdefault(edge_tiles[edge], []).insert(0, pathlength)
+            result[edge] = pathlength
+        return result
+
+    def _load_walls(self, game_state):
+        """Gets the layout of the firewalls in game_state from the cache, or from the walls bitboard of its map
+
+        Returns:
+            The WallLayout for the current board, whose blocked array is now used for searching
+
+        """
+        key = game_state.game_map.walls
+        layout = self.cache.lookup(key)
+        if layout is None:
+            blocked = bytearray(ARENA_TILES)
+            for tile in tiles(key):
+                blocked[tile] = 1
+            layout = self.cache.store(key, bytes(blocked))
+        self.blocked = layout.blocked
+        return layout
+
+    def _set_end_points(self, end_points):
+        """Stores the tile ids and direction of the edge we are searching for
+        """
+        self._end_tiles = tuple(TILE_ID[x][y] for x, y in end_points)
+        self._end_set = frozenset(self._end_tiles)
+        self._direction = self._get_direction_from_endpoints(end_points)
+        self._idealness = IDEALNESS[EDGE_DIRECTIONS.index(tuple(self._direction))]
+
+    def _idealness_search(self, start):
+        """
+        Finds the most ideal tile in our 'pocket' of pathable space.
         The edge if it is available, or the best self destruct location otherwise
         """
-        current = queue.Queue()
-        current.put(start)
-        best_idealness = self._get_idealness(start, end_points)
-        self.game_map[start[0]][start[1]].visited_idealness = True
+        end_set = self._end_set
+        if start in end_set:
+            return start
+
+        blocked = self.blocked
+        visited = self._visited
+        visited[:] = _CLEAR
+        visited[start] = 1
+        current = deque([start])
+        idealness = self._idealness
+        best_idealness = idealness[start]
         most_ideal = start
 
-        while not current.empty():
-            search_location = current.get()
-            for neighbor in self._get_neighbors(search_location):
-                if not self.game_state.game_map.in_arena_bounds(neighbor) or self.game_map[neighbor[0]][neighbor[1]].blocked:
+        while current:
+            search_tile = current.popleft()
+            for neighbor in NEIGHBORS[search_tile]:
+                if visited[neighbor] or blocked[neighbor]:
                     continue
-
-                x, y = neighbor
-                current_idealness = self._get_idealness(neighbor, end_points)
-
-                if current_idealness > best_idealness:
-                    best_idealness = current_idealness
+                #Nothing is more ideal than the edge itself, so the first edge tile found ends the search
+                if neighbor in end_set:
+                    return neighbor
+                visited[neighbor] = 1
+                current.append(neighbor)
+
+                if idealness[neighbor] > best_idealness:
+                    best_idealness = idealness[neighbor]
                     most_ideal = neighbor
 
-                if not self.game_map[x][y].visited_idealness and not self.game_map[x][y].blocked:
-                    self.game_map[x][y].visited_idealness = True
-                    current.put(neighbor)
-
         return most_ideal
 
-    def _get_neighbors(self, location):
-        """Get the locations adjacent to a location
-        """
-        x, y = location
-        return [[x, y + 1], [x, y - 1], [x + 1, y], [x - 1, y]]
-
     def _get_direction_from_endpoints(self, end_points):
         """Prints a message to the games debug output
 
         Args:
-            * end_points: A set of endpoints, should be an edge 
+            * end_points: A set of endpoints, should be an edge
 
         Returns:
             A direction [x,y] representing the edge. For example, [1,1] for the top right and [-1, 1] for the top left
@@ -128,163 +363,140 @@ class ShortestPathFinder:
         point = end_points[0]
         x, y = point
         direction = [1, 1]
-        if x < self.game_state.HALF_ARENA:
+        if x < HALF_ARENA:
            direction[0] = -1
-        if y < self.game_state.HALF_ARENA:
+        if y < HALF_ARENA:
             direction[1] = -1
         return direction
 
-    def _get_idealness(self, location, end_points):
+    def _get_idealness(self, tile):
         """Get the idealness of a tile, the reachable tile the unit most wants to path to.
-        Better self destruct locations are more ideal. The endpoints are perfectly ideal. 
+        Better self destruct locations are more ideal. The endpoints are perfectly ideal.
 
         Returns:
             A location the unit will attempt to reach
         """
-        if location in end_points:
+        if tile in self._end_set:
             return sys.maxsize
 
-        direction = self._get_direction_from_endpoints(end_points)
+        return self._idealness[tile]
 
-        idealness = 0
-        if direction[1] == 1:
-            idealness += 28 * location[1]
-        else: 
-            idealness += 28 * (27 - location[1])
-        if direction[0] == 1:
-            idealness += location[0]
-        else: 
-            idealness += (27 - location[0])
+    def _validate(self, ideal_tile):
+        """Breadth first search of the grid, finding the pathlength of each tile
 
-        return idealness
-
-    def _validate(self, ideal_tile, end_points):
-        """Breadth first search of the grid, setting the pathlengths of each node
+        Returns:
+            A list holding the distance between each tile id and the ideal tile (or the edge if it was reached),
+            -1 for tiles outside of the pocket
 
         """
         #VALDIATION
         #Add our most ideal tiles to current
-        current = queue.Queue()
-        if ideal_tile in end_points:
-            for location in end_points:
-               current.put(location)
-               #Set current pathlength to 0
-               self.game_map[location[0]][location[1]].pathlength = 0
-               self.game_map[location[0]][location[1]].visited_validate = True
-        else:
-            current.put(ideal_tile)
-            self.game_map[ideal_tile[0]][ideal_tile[1]].pathlength = 0
-            self.game_map[ideal_tile[0]][ideal_tile[1]].visited_validate = True
+        pathlength = list(_UNREACHED)
+        blocked = self.blocked
+        seeds = self._end_tiles if ideal_tile in self._end_set else (ideal_tile,)
+        current = deque()
+        for tile in seeds:
+            #Blocked edge tiles count as reached but nothing can path through them
+            pathlength[tile] = 0
+            if not blocked[tile]:
+                current.append(tile)
 
         #While current is not empty
-        while not current.empty():
-            current_location = current.get()
-            current_node = self.game_map[current_location[0]][current_location[1]]
-            for neighbor in self._get_neighbors(current_location):
-                if not self.game_state.game_map.in_arena_bounds(neighbor) or self.game_map[neighbor[0]][neighbor[1]].blocked:
-                    continue
-
-                neighbor_node = self.game_map[neighbor[0]][neighbor[1]]
-                if not neighbor_node.visited_validate and not current_node.blocked:
-                    neighbor_node.pathlength = current_node.pathlength + 1
-                    neighbor_node.visited_validate = True
-                    current.put(neighbor)
+        while current:
+            current_tile = current.popleft()
+            distance = pathlength[current_tile] + 1
+            for neighbor in NEIGHBORS[current_tile]:
+                if pathlength[neighbor] == -1 and not blocked[neighbor]:
+                    pathlength[neighbor] = distance
+                    current.append(neighbor)
 
-        #debug_write("Print after validate")
-        #self.print_map()
-        return
+        return pathlength
 
-    def _get_path(self, start_point, end_points):
-        """Once all nodes are validated, and a target is found, the unit can path to its target
+    def _get_path(self, start_point, start):
+        """Once all tiles are validated, and a target is found, the unit can path to its target
 
         """
         #GET THE PATH
+        pathlength = self.pathlength
         path = [start_point]
-        current = start_point
+        current = start
         move_direction = 0
 
-        while not self.game_map[current[0]][current[1]].pathlength == 0:
-            #debug_write("current tile {} has cost {}".format(current, self.game_map[current[0]][current[1]].pathlength))
-            next_move = self._choose_next_move(current, move_direction, end_points)
-            #debug_write(next_move)
+        while not pathlength[current] == 0:
+            next_move = self._choose_next_move(current, move_direction)
 
-            if current[0] == next_move[0]:
+            if TILE_X[current] == TILE_X[next_move]:
                 move_direction = self.VERTICAL
             else:
                 move_direction = self.HORIZONTAL
-            path.append(next_move)
+            path.append([TILE_X[next_move], TILE_Y[next_move]])
             current = next_move
-        
-        #debug_write(path)
+
         return path
-  
-    def _choose_next_move(self, current_point, previous_move_direction, end_points):
-        """Given the current location and adjacent locations, return the best 'next step' for a given unit to take
+
+    def _choose_next_move(self, current_tile, previous_move_direction):
+        """Given the current tile and adjacent tiles, return the best 'next step' for a given unit to take
         """
-        neighbors = self._get_neighbors(current_point)
-        #debug_write("Unit at {} previously moved {} and has these neighbors {}".format(current_point, previous_move_direction, neighbors))
-
-        ideal_neighbor = current_point
-        best_pathlength = self.game_map[current_point[0]][current_point[1]].pathlength
-        for neighbor in neighbors:
-            #debug_write("Comparing champ {} and contender {}".format(ideal_neighbor, neighbor))
-            if not self.game_state.game_map.in_arena_bounds(neighbor) or self.game_map[neighbor[0]][neighbor[1]].blocked:
+        pathlength = self.pathlength
+        blocked = self.blocked
+
+        ideal_neighbor = current_tile
+        best_pathlength = pathlength[current_tile]
+        for neighbor in NEIGHBORS[current_tile]:
+            if blocked[neighbor]:
                 continue
 
-            new_best = False
-            x, y = neighbor
-            current_pathlength = self.game_map[x][y].pathlength
+            current_pathlength = pathlength[neighbor]
 
             #Filter by pathlength
             if current_pathlength > best_pathlength:
                 continue
-            elif current_pathlength < best_pathlength:
-                #debug_write("Contender has better pathlength at {} vs champs {}".format(current_pathlength, best_pathlength))
-                new_best = True
 
             #Filter by direction based on prev move
-            if not new_best and not self._better_direction(current_point, neighbor, ideal_neighbor, previous_move_direction, end_points):
+            if current_pathlength == best_pathlength and not self._better_direction(current_tile, neighbor, ideal_neighbor, previous_move_direction):
                 continue
 
             ideal_neighbor = neighbor
             best_pathlength = current_pathlength
 
-        #debug_write("Gave unit at {} new tile {}".format(current_point, ideal_neighbor))
         return ideal_neighbor
 
-    def _better_direction(self, prev_tile, new_tile, prev_best, previous_move_direction, end_points):
+    def _better_direction(self, prev_tile, new_tile, prev_best, previous_move_direction):
         """Compare two tiles and return True if the unit would rather move to the new one
 
         """
+        prev_x, prev_y = TILE_X[prev_tile], TILE_Y[prev_tile]
+        new_x, new_y = TILE_X[new_tile], TILE_Y[new_tile]
+        best_x, best_y = TILE_X[prev_best], TILE_Y[prev_best]
+
         #True if we are moving in a different direction than prev move and prev is not
         #If we previously moved horizontal, and now one of our options has a different x position then the other (the two options are not up/down)
-        if previous_move_direction == self.HORIZONTAL and not new_tile[0] == prev_best[0]:
+        if previous_move_direction == self.HORIZONTAL and not new_x == best_x:
             #We want to go up now. If we have not changed our y, we are not going up
-            if prev_tile[1] == new_tile[1]:
-                return False 
+            if prev_y == new_y:
+                return False
             return True
-        if previous_move_direction == self.VERTICAL and not new_tile[1] == prev_best[1]:
-            if prev_tile[0] == new_tile[0]:
-                #debug_write("contender {} has the same x coord as prev tile {} so we will keep best move {}".format(new_tile, prev_tile, prev_best))
+        if previous_move_direction == self.VERTICAL and not new_y == best_y:
+            if prev_x == new_x:
                 return False
             return True
-        if previous_move_direction == 0: 
-            if prev_tile[1] == new_tile[1]: 
+        if previous_move_direction == 0:
+            if prev_y == new_y:
                 return False
             return True
-        
-        #To make it here, both moves are on the same axis 
-        direction = self._get_direction_from_endpoints(end_points)
-        if new_tile[1] == prev_best[1]: #If they both moved horizontal...
-            if direction[0] == 1 and new_tile[0] > prev_best[0]: #If we moved right and right is our direction, we moved towards our direction
-                return True 
-            if direction[0] == -1 and new_tile[0] < prev_best[0]: #If we moved left and left is our direction, we moved towards our direction
-                return True 
-            return False 
-        if new_tile[0] == prev_best[0]: #If they both moved vertical...
-            if direction[1] == 1 and new_tile[1] > prev_best[1]: #If we moved up and up is our direction, we moved towards our direction
+
+        #To make it here, both moves are on the same axis
+        direction = self._direction
+        if new_y == best_y: #If they both moved horizontal...
+            if direction[0] == 1 and new_x > best_x: #If we moved right and right is our direction, we moved towards our direction
+                return True
+            if direction[0] == -1 and new_x < best_x: #If we moved left and left is our direction, we moved towards our direction
+                return True
+            return False
+        if new_x == best_x: #If they both moved vertical...
+            if direction[1] == 1 and new_y > best_y: #If we moved up and up is our direction, we moved towards our direction
                 return True
-            if direction[1] == -1 and new_tile[1] < prev_best[1]: #If we moved down and down is our direction, we moved towards our direction
+            if direction[1] == -1 and new_y < best_y: #If we moved down and down is our direction, we moved towards our direction
                 return True
             return False
         return True
@@ -299,9 +511,9 @@ class ShortestPathFinder:
 
         for y in range(28):
             for x in range(28):
-                node = self.game_map[x][28 - y - 1]
-                if not node.blocked and not node.pathlength == -1:
-                    self._print_justified(node.pathlength)
+                tile = TILE_ID[x][28 - y - 1]
+                if not tile == -1 and not self.blocked[tile] and not self.pathlength[tile] == -1:
+                    self._print_justified(self.pathlength[tile])
                 else:
                     sys.stderr.write("   ")
             debug_write("")
@@ -314,3 +526,239 @@ class ShortestPathFinder:
             sys.stderr.write(" ")
         sys.stderr.write(str(number))
         sys.stderr.write(" ")
+
+
+class DynamicPathFinder(ShortestPathFinder):
+    """Keeps a pathlength field up to date while single firewalls are added and removed
+
+    Made for planners that try one wall placement at a time: set_blocked repairs only the part of the
+    pathlength field that changed instead of searching the whole board again. When a change moves the
+    most ideal tile of a pocket the field is thrown away and rebuilt by the next call to navigate.
+    Changes made here are hypothetical and do not touch the game map.
+
+    Attributes:
+        * repairs (int): The number of times the field was repaired in place
+        * full_searches (int): The number of times the field had to be searched from scratch
+
+    """
+    def __init__(self, game_state, end_points):
+        """Reads the walls of game_state
+
+        Args:
+            * game_state: The game state whose walls we start from
+            * end_points: The end points of the units, should be a list of edge locations
+
+        """
+        super().__init__()
+        self.initialize_map(game_state)
+        self.blocked = bytearray(self._load_walls(game_state).blocked)
+        self._set_end_points(end_points)
+        self._seeds = None
+        self.repairs = 0
+        self.full_searches = 0
+
+    def set_blocked(self, location, blocked=True):
+        """Adds or removes a hypothetical firewall and repairs the pathlength field
+
+        Args:
+            * location: The location of the firewall
+            * blocked: True to add a firewall, False to remove one
+
+        """
+        tile = tile_of(location)
+        if tile == -1 or self.blocked[tile] == blocked:
+            return
+        self.blocked[tile] = 1 if blocked else 0
+        if self._seeds is None:
+            return
+
+        if blocked:
+            if tile in self._seeds and not self._seeds is self._end_tiles:
+                #The most ideal tile itself is gone
+                self._seeds = None
+                return
+            self._repair_blocked(tile)
+        else:
+            if not self._seeds is self._end_tiles and self._grows_pocket(tile):
+                self._seeds = None
+                return
+            self._repair_unblocked(tile)
+        self.repairs += 1
+
+    def navigate(self, start_point):
+        """Finds the path a unit would take with the current hypothetical walls
+
+        Args:
+            * start_point: The starting location of the unit
+
+        Returns:
+            The path a unit at start_point would take, or None if start_point is blocked
+
+        """
+        start = tile_of(start_point)
+        if start == -1 or self.blocked[start]:
+            return
+        #Tiles outside of the field are in a different pocket, with a different most ideal tile
+        if self._seeds is None or self.pathlength[start] == -1:
+            ideal_tile = self._idealness_search(start)
+            self._seeds = self._end_tiles if ideal_tile in self._end_set else (ideal_tile,)
+            self.pathlength = self._validate(ideal_tile)
+            self.full_searches += 1
+        return self._get_path(start_point, start)
+
+    def navigate_multiple_endpoints(self, start_point, end_points, game_state=None):
+        """Finds the path a unit would take to reach a set of endpoints with the current hypothetical walls
+
+        Args:
+            * start_point: The starting location of the unit
+            * end_points: The end points of the unit, should be a list of edge locations
+            * game_state: Ignored, the walls are the ones set on this finder
+
+        Returns:
+            The path a unit at start_point would take, or None if start_point is blocked
+
+        """
+        return self.navigate_multiple_starts([start_point], end_points)[0]
+
+    def navigate_multiple_starts(self, start_points, end_points, game_state=None):
+        """Finds the paths units at several locations would take with the current hypothetical walls
+
+        Unlike ShortestPathFinder, the walls are never read from the game state or the path cache, so
+        set_blocked keeps working afterwards. Switching to different end points drops the current field.
+
+        Args:
+            * start_points: A list of starting locations
+            * end_points: The end points of the units, should be a list of edge locations
+            * game_state: Ignored, the walls are the ones set on this finder
+
+        Returns:
+            A list with the path for each start point, in the same order. Start points that are blocked
+            or outside of the arena get None instead of a path.
+
+        """
+        if not tuple(TILE_ID[x][y] for x, y in end_points) == self._end_tiles:
+            self._set_end_points(end_points)
+            self._seeds = None
+        return [self.navigate(start_point) for start_point in start_points]
+
+    def edge_fields(self, game_state=None, vectorized=False):
+        """Finds the distance from every tile to each of the four edges with the current hypothetical walls
+
+        The fields are new lists that are neither cached nor repaired by set_blocked.
+
+        Args:
+            * game_state: Ignored, the walls are the ones set on this finder
+            * vectorized: Search all four edges at once with NumPy array operations. Ignored if NumPy is not installed.
+
+        Returns:
+            A list of four pathlength fields indexed by tile id, in the order of the GameMap edge constants
+
+        """
+        if vectorized and np is not None:
+            return _edge_fields_numpy(self.blocked, EDGE_TILES)
+        end_points = [TILE_LOCATIONS[tile] for tile in self._end_tiles]
+        fields = []
+        for tiles in EDGE_TILES:
+            self._set_end_points([TILE_LOCATIONS[tile] for tile in tiles])
+            fields.append(self._validate(self._end_tiles[0]))
+        self._set_end_points(end_points)
+        return fields
+
+    def _grows_pocket(self, tile):
+        """Checks if unblocking tile changes the most ideal tile of a pocket without an edge
+
+        """
+        pathlength = self.pathlength
+        joins_pocket = False
+        joins_other = False
+        for neighbor in NEIGHBORS[tile]:
+            if self.blocked[neighbor]:
+                continue
+            if pathlength[neighbor] == -1:
+                joins_other = True
+            else:
+                joins_pocket = True
+        #Merging with another region or adding a better tile can both move the most ideal tile
+        return joins_pocket and (joins_other or self._get_idealness(tile) > self._get_idealness(self._seeds[0]))
+
+    def _repair_blocked(self, tile):
+        """Raises the pathlengths of the tiles whose shortest paths went through a newly blocked tile
+
+        """
+        pathlength = self.pathlength
+        blocked = self.blocked
+        old_pathlength = pathlength[tile]
+        if old_pathlength == -1:
+            return
+        if not tile in self._end_set:
+            pathlength[tile] = -1
+
+        #Find every tile that has no neighbor left one step closer to the target
+        affected = {tile}
+        current = deque([tile])
+        levels = {tile: old_pathlength}
+        while current:
+            current_tile = current.popleft()
+            distance = levels[current_tile] + 1
+            for neighbor in NEIGHBORS[current_tile]:
+                if neighbor in affected or blocked[neighbor] or not pathlength[neighbor] == distance:
+                    continue
+                supported = False
+                for support in NEIGHBORS[neighbor]:
+                    if pathlength[support] == distance - 1 and not blocked[support] and not support in affected:
+                        supported = True
+                        break
+                if not supported:
+                    affected.add(neighbor)
+                    levels[neighbor] = distance
+                    current.append(neighbor)
+        affected.discard(tile)
+
+        #Search outwards from the unaffected tiles bordering the affected ones
+        for affected_tile in affected:
+            pathlength[affected_tile] = -1
+        frontier = []
+        for affected_tile in affected:
+            best = -1
+            for neighbor in NEIGHBORS[affected_tile]:
+                distance = pathlength[neighbor]
+                if not distance == -1 and not blocked[neighbor] and (best == -1 or distance + 1 < best):
+                    best = distance + 1
+            if not best == -1:
+                frontier.append((best, affected_tile))
+        heapq.heapify(frontier)
+        while frontier:
+            distance, affected_tile = heapq.heappop(frontier)
+            if not pathlength[affected_tile] == -1:
+                continue
+            pathlength[affected_tile] = distance
+            for neighbor in NEIGHBORS[affected_tile]:
+                if neighbor in affected and pathlength[neighbor] == -1:
+                    heapq.heappush(frontier, (distance + 1, neighbor))
+
+    def _repair_unblocked(self, tile):
+        """Lowers the pathlengths of the tiles that can now path through a newly unblocked tile
+
+        """
+        pathlength = self.pathlength
+        blocked = self.blocked
+        if not tile in self._seeds:
+            best = -1
+            for neighbor in NEIGHBORS[tile]:
+                distance = pathlength[neighbor]
+                if not distance == -1 and not blocked[neighbor] and (best == -1 or distance + 1 < best):
+                    best = distance + 1
+            pathlength[tile] = best
+            if best == -1:
+                return
+
+        current = deque([tile])
+        while current:
+            current_tile = current.popleft()
+            distance = pathlength[current_tile] + 1
+            for neighbor in NEIGHBORS[current_tile]:
+                if blocked[neighbor]:
+                    continue
+                if pathlength[neighbor] == -1 or pathlength[neighbor] > distance:
+                    pathlength[neighbor] = distance
+                    current.append(neighbor)
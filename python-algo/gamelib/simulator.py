@@ -0,0 +1,755 @@
+from collections import namedtuple
+
+from .navigation import ShortestPathFinder
+from .util import load_state
+from .bitboard import range_mask, tiles
+from .geometry import ARENA_TILES, EDGE_LOCATION_SETS, HALF_ARENA, TILE_LOCATIONS, TILE_X, TILE_Y, X_MAJOR_RANK, \
+    tile_of, tiles_in_range, tiles_reaching
+from .live_board import unit_ids
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+EVENT_TYPES = ("selfDestruct", "breach", "damage", "shield", "move", "spawn", "death", "attack", "melee")
+
+class SimulationResult(namedtuple("SimulationResult", ["game_state", "frames", "breaches", "damage_dealt", "units_lost"])):
+    """The outcome of playing out an action phase with ActionSimulator
+
+    Attributes:
+        * game_state (:obj: GameState): The board at the end of the action phase. The health and cores of both players
+          include the breaches of the action phase
+        * frames (list): The action frames, as decoded dicts shaped like the frames passed to on_action_frame.
+          Empty when the frames were not recorded
+        * breaches (list): The number of information units of each player that reached the enemy edge, indexed by player
+        * damage_dealt (list): The damage the units of each player dealt to enemy units, self destructs included
+        * units_lost (list): The number of units each player lost, not counting the units that breached
+
+    """
+    __slots__ = ()
+
+class BatchResult(namedtuple("BatchResult", ["breaches", "damage_dealt", "units_lost"])):
+    """The outcome of playing out many deployments with BatchSimulator
+
+    Attributes:
+        * breaches (list): The number of deployed units that reached the enemy edge, for each deployment
+        * damage_dealt (list): The damage the deployed units dealt to enemy firewalls, self destructs included, for each deployment
+        * units_lost (list): The number of deployed units destroyed or self destructed, for each deployment
+
+    """
+    __slots__ = ()
+
+class _Mover:
+    """
+    The state of an information unit that the board itself does not keep.
+    """
+    __slots__ = ("unit", "unit_id", "spec", "player_index", "tile", "edge", "path", "step", "progress", "moved", "shield", "shielded_by")
+
+    def __init__(self, unit, unit_id, spec, tile, edge):
+        self.unit = unit
+        self.tile = tile
+        self.unit_id = unit_id
+        self.spec = spec
+        self.player_index = unit.player_index
+        self.edge = edge
+        self.path = None
+        self.step = 0
+        self.progress = 0.0
+        self.moved = 0
+        self.shield = 0.0
+        self.shielded_by = set()
+
+class ActionSimulator:
+    """Plays out the action phase of a turn locally, frame by frame
+
+    Each frame runs the same steps in the same order:
+
+    1. Shields decay by shieldDecayPerFrame, then every encryptor shields the friendly information units in its
+       range that it has not shielded before.
+    2. Information units move once every 1/speed frames along the path ShortestPathFinder gives them. When a
+       stationary unit is destroyed, the paths are worked out again from where the units stand, as the engine does
+       when rerouteMidRound is set. A unit reaching its target edge breaches, costing the enemy the damageToPlayer
+       of its type in health and earning its owner coresForPlayerDamage cores per point. A unit at the end of its path
+       anywhere else self destructs, dealing its max stability to the enemy stationary units within selfDestructRadius
+       when it has moved at least stepsRequiredSelfDestruct times.
+    3. Every information unit and destructor attacks the target get_targets picks for it. Information units deal
+       damageF to stationary units and damageI to information units, destructors only attack information units.
+       Every attack of a frame is chosen before any damage is dealt.
+
+    Units left with no stability are removed after the moves and after the attacks. The action phase ends when no
+    information unit is left. Stationary units pending removal stay on the board, see LiveBoard.predict_next_turn.
+
+    The simulator keeps its own ShortestPathFinder, so running many candidate deployments against the same board
+    reuses the pathfinding of earlier runs.
+
+    Attributes:
+        * game_state (:obj: GameState): The board the action phase starts from
+        * max_frames (int): The action phase is cut short after this many frames
+
+    """
+    def __init__(self, game_state, max_frames=1000):
+        """Prepares to simulate the action phase from a board
+
+        Args:
+            * game_state (:obj: GameState): The board at the start of the action phase. Use GameState.simulate_action_phase
+              to start from the board of the turn and the units spawned on it with attempt_spawn
+            * max_frames: The action phase is cut short after this many frames
+
+        """
+        self.game_state = game_state
+        self.max_frames = max_frames
+        self.__path_finder = ShortestPathFinder()
+
+        config = game_state.config
+        mechanics = config["mechanics"]
+        self.__shield_decay = mechanics.get("shieldDecayPerFrame", 0)
+        self.__self_destruct_steps = mechanics.get("stepsRequiredSelfDestruct", 5)
+        self.__self_destruct_radius = mechanics.get("selfDestructRadius", 1.5)
+        self.__reroute = mechanics.get("rerouteMidRound", True)
+        self.__cores_per_damage = config["resources"].get("coresForPlayerDamage", 1)
+        self.__damage_to_player = [information.get("damageToPlayer", mechanics.get("basePlayerHealthDamage", 1))
+            for information in config["unitInformation"]]
+
+    def run(self, build_stack=(), deploy_stack=(), enemy_build_stack=(), enemy_deploy_stack=(), record=True, unit_lists=False):
+        """Plays out the action phase with the given units spawned at its start
+
+        The stacks are shaped like the _build_stack and _deploy_stack of a GameState: build entries are
+        (unit_type, x, y), with REMOVE marking a unit for removal, and deploy entries are (unit_type, x, y, count).
+        Entries on blocked or invalid locations are skipped. No resources are spent on them.
+
+        Args:
+            * build_stack: The stationary units you build
+            * deploy_stack: The information units you deploy
+            * enemy_build_stack: The stationary units your opponent builds
+            * enemy_deploy_stack: The information units your opponent deploys
+            * record: If false, no frames are recorded, which is faster when only the outcome is needed
+            * unit_lists: If true, the p1Units and p2Units of every frame are filled in. They are left empty otherwise
+
+        Returns:
+            A SimulationResult
+
+        """
+        state = self.game_state.fork()
+        state._shortest_path_finder = self.__path_finder
+        game_map = state.game_map
+        unit_specs = state.unit_specs
+        type_index = unit_specs.type_index
+        destructor_spec = unit_specs.by_type[unit_specs.DESTRUCTOR]
+        encryptor_spec = unit_specs.by_type[unit_specs.ENCRYPTOR]
+        health = [state.my_health, state.enemy_health]
+        resources = state._player_resources
+        frames = []
+        breaches = [0, 0]
+        damage_dealt = [0, 0]
+        units_lost = [0, 0]
+
+        # Every unit gets an id, those of the turn keep theirs so the frames match the engine's
+        ids = {}
+        numeric_ids = [0]
+        for unit_id, unit in unit_ids(game_map, load_state(state.serialized_string)).items():
+            ids[unit] = unit_id
+            if str(unit_id).isdigit():
+                numeric_ids.append(int(unit_id))
+        next_id = [max(numeric_ids) + 1]
+
+        def new_id(unit):
+            unit_id = ids.get(unit)
+            if unit_id is None:
+                unit_id = str(next_id[0])
+                next_id[0] += 1
+                if unit is not None:
+                    ids[unit] = unit_id
+            return unit_id
+
+        events = None
+
+        def new_frame(frame_number):
+            frame = {
+                "p1Units": [[] for _ in unit_specs.unit_types],
+                "p2Units": [[] for _ in unit_specs.unit_types],
+                "turnInfo": [1, state.turn_number, frame_number],
+                "p1Stats": [health[0], resources[0]['cores'], resources[0]['bits'], state.my_time],
+                "p2Stats": [health[1], resources[1]['cores'], resources[1]['bits'], state.enemy_time],
+                "events": {event_type: [] for event_type in EVENT_TYPES}}
+            frames.append(frame)
+            return frame["events"]
+
+        def finish_frame():
+            frame = frames[-1]
+            frame["p1Stats"][:2] = [health[0], resources[0]['cores']]
+            frame["p2Stats"][:2] = [health[1], resources[1]['cores']]
+            if unit_lists:
+                self.__fill_unit_lists(frame, game_map, movers, new_id)
+
+        # Frame 0 spawns the units of the stacks
+        if record:
+            events = new_frame(0)
+        for player_index, stack in ((0, build_stack), (1, enemy_build_stack)):
+            for unit_type, x, y in (entry[:3] for entry in stack):
+                tile = tile_of([x, y])
+                if tile == -1:
+                    continue
+                if unit_type == unit_specs.REMOVE:
+                    if game_map.tile_occupied[tile] and game_map.tile_owner[tile] == player_index:
+                        game_map.set_pending_removal(tile)
+                        if record:
+                            events["spawn"].append([[x, y], type_index[unit_type], new_id(None), player_index + 1])
+                    continue
+                if game_map.tile_occupied[tile] or unit_type not in unit_specs.FIREWALL_TYPES:
+                    continue
+                unit = game_map.add_unit(unit_type, [x, y], player_index)
+                unit_id = new_id(unit)
+                if record:
+                    events["spawn"].append([[x, y], type_index[unit_type], unit_id, player_index + 1])
+        for player_index, stack in ((0, deploy_stack), (1, enemy_deploy_stack)):
+            for entry in stack:
+                unit_type, x, y = entry[:3]
+                count = entry[3] if len(entry) > 3 else 1
+                tile = tile_of([x, y])
+                if tile == -1 or game_map.tile_occupied[tile] or unit_type in unit_specs.FIREWALL_TYPES:
+                    continue
+                for _ in range(count):
+                    unit = game_map.add_unit(unit_type, [x, y], player_index)
+                    unit_id = new_id(unit)
+                    if record:
+                        events["spawn"].append([[x, y], type_index[unit_type], unit_id, player_index + 1])
+
+        movers = []
+        for tile in sorted(game_map.mobile_units):
+            for unit in game_map.mobile_units[tile]:
+                edge = state.get_target_edge([unit.x, unit.y])
+                movers.append(_Mover(unit, new_id(unit), unit._spec, tile, edge))
+        if record:
+            finish_frame()
+
+        # Encryptors and destructors only change when the walls do
+        layout = [None, None]
+        attacker_counts = [None, None]
+        shielders_by_tile = {}
+
+        def firewalls():
+            if layout[0] != game_map.walls:
+                layout[0] = game_map.walls
+                encryptors = [list(tiles(game_map.get_bitboard(unit_specs.ENCRYPTOR, player_index))) for player_index in (0, 1)]
+                destructors = [set(tiles(game_map.get_bitboard(unit_specs.DESTRUCTOR, player_index))) for player_index in (0, 1)]
+                layout[1] = (encryptors, destructors)
+                attacker_counts[:] = [game_map.get_attacker_counts(player_index) for player_index in (0, 1)]
+                shielders_by_tile.clear()
+            return layout[1]
+
+        paths_walls = None
+        frame_number = 0
+        while movers and frame_number < self.max_frames:
+            frame_number += 1
+            if record:
+                events = new_frame(frame_number)
+
+            # Shields
+            decay = self.__shield_decay
+            encryptors, destructors = firewalls()
+            damaged = []
+            for mover in movers:
+                unit = mover.unit
+                if mover.shield > 0:
+                    lost = min(mover.shield, decay)
+                    mover.shield -= lost
+                    unit.stability -= lost
+                    if unit.stability <= 0:
+                        damaged.append(unit)
+                        continue
+                if not encryptors[mover.player_index]:
+                    continue
+                key = (mover.tile, mover.player_index)
+                shielders = shielders_by_tile.get(key)
+                if shielders is None:
+                    shielders = [shielder for shielder in encryptors[mover.player_index]
+                        if range_mask(shielder, encryptor_spec.range) >> mover.tile & 1]
+                    shielders_by_tile[key] = shielders
+                for shielder in shielders:
+                    if shielder in mover.shielded_by:
+                        continue
+                    mover.shielded_by.add(shielder)
+                    amount = encryptor_spec.damage
+                    mover.shield += amount
+                    unit.stability += amount
+                    if record:
+                        events["shield"].append([list(TILE_LOCATIONS[shielder]), [unit.x, unit.y], amount,
+                            encryptor_spec.index, new_id(game_map.get_units(shielder)[0]), mover.unit_id, mover.player_index + 1])
+
+            if self.__remove_dead(game_map, damaged, units_lost, events, new_id):
+                movers = [mover for mover in movers if mover.unit.stability > 0]
+
+            # Moves
+            if paths_walls is None or (self.__reroute and game_map.walls != paths_walls):
+                self.__route(state, movers)
+                paths_walls = game_map.walls
+            damaged = []
+            remaining = []
+            for mover in movers:
+                mover.progress += mover.spec.speed
+                if mover.progress < 1 - 1e-9:
+                    remaining.append(mover)
+                    continue
+                mover.progress -= 1
+                unit = mover.unit
+                player_index = mover.player_index
+                path = mover.path
+                if path is not None and mover.step + 1 < len(path):
+                    mover.step += 1
+                    location = path[mover.step]
+                    if record:
+                        events["move"].append([[unit.x, unit.y], list(location), [-1, -1], mover.spec.index, mover.unit_id, player_index + 1])
+                    game_map.move_unit(unit, location)
+                    mover.tile = tile_of(location)
+                    mover.moved += 1
+                    if tuple(location) not in EDGE_LOCATION_SETS[mover.edge]:
+                        remaining.append(mover)
+                        continue
+                    damage = self.__damage_to_player[mover.spec.index]
+                    health[1 - player_index] -= damage
+                    resources[player_index]['cores'] += damage * self.__cores_per_damage
+                    breaches[player_index] += 1
+                    if record:
+                        events["breach"].append([list(location), damage, mover.spec.index, mover.unit_id, player_index + 1])
+                    game_map.delete_unit(unit)
+                    continue
+
+                # Stuck at the end of its path
+                location = [unit.x, unit.y]
+                if mover.moved >= self.__self_destruct_steps:
+                    damage = mover.spec.max_stability
+                    targets = []
+                    for target_tile in tiles_in_range(mover.tile, self.__self_destruct_radius):
+                        if game_map.tile_occupied[target_tile] and game_map.tile_owner[target_tile] != player_index:
+                            target = game_map.get_units(target_tile)[0]
+                            target.stability -= damage
+                            damaged.append(target)
+                            damage_dealt[player_index] += damage
+                            targets.append(list(TILE_LOCATIONS[target_tile]))
+                            if record:
+                                events["damage"].append([targets[-1], damage, target._spec.index, new_id(target), target.player_index + 1])
+                    if record:
+                        events["selfDestruct"].append([location, targets, damage, mover.spec.index, mover.unit_id, player_index + 1])
+                if record:
+                    events["death"].append([location, mover.spec.index, mover.unit_id, player_index + 1, False])
+                units_lost[player_index] += 1
+                game_map.delete_unit(unit)
+            movers = remaining
+            self.__remove_dead(game_map, damaged, units_lost, events, new_id)
+
+            # Attacks
+            attackers = [mover.unit for mover in movers]
+            # Only the destructors reaching an enemy information unit can have a target
+            encryptors, destructors = firewalls()
+            reaching = set()
+            for mover in movers:
+                enemy_destructors = destructors[1 - mover.player_index]
+                if enemy_destructors and attacker_counts[mover.player_index][mover.tile]:
+                    reaching.update(tile for tile in tiles_reaching(mover.tile, destructor_spec.range) if tile in enemy_destructors)
+            attackers.extend(game_map.get_units(tile)[0] for tile in sorted(reaching))
+            damaged = []
+            for attacker, target in zip(attackers, state.get_targets(attackers)):
+                if target is None:
+                    continue
+                spec = attacker._spec
+                if spec.stationary:
+                    if target.stationary:
+                        continue
+                    damage = spec.damage
+                else:
+                    damage = spec.damage_f if target.stationary else spec.damage_i
+                if not damage:
+                    continue
+                target.stability -= damage
+                damaged.append(target)
+                damage_dealt[attacker.player_index] += damage
+                if record:
+                    attacker_id, target_id = new_id(attacker), new_id(target)
+                    events["attack"].append([[attacker.x, attacker.y], [target.x, target.y], damage, spec.index, attacker_id, target_id, attacker.player_index + 1])
+                    events["damage"].append([[target.x, target.y], damage, target._spec.index, target_id, target.player_index + 1])
+            if self.__remove_dead(game_map, damaged, units_lost, events, new_id):
+                movers = [mover for mover in movers if mover.unit.stability > 0]
+            if record:
+                finish_frame()
+
+        # Units still on the board when the action phase is cut short leave it, as they would at its end
+        for mover in movers:
+            game_map.delete_unit(mover.unit)
+        state.my_health, state.enemy_health = health
+        return SimulationResult(state, frames, breaches, damage_dealt, units_lost)
+
+    def __route(self, state, movers):
+        """
+        Works out the path of every information unit from where it stands, with a single search per edge.
+        """
+        by_edge = {}
+        for mover in movers:
+            by_edge.setdefault(mover.edge, {}).setdefault(mover.tile, []).append(mover)
+        for edge, by_tile in by_edge.items():
+            starts = list(by_tile)
+            paths = state.find_paths_to_edge([list(TILE_LOCATIONS[tile]) for tile in starts], edge)
+            for tile, path in zip(starts, paths):
+                for mover in by_tile[tile]:
+                    mover.path = path
+                    mover.step = 0
+
+    def __remove_dead(self, game_map, damaged, units_lost, events, new_id):
+        """
+        Removes the damaged units left with no stability, returning whether any were removed.
+        """
+        removed = False
+        seen = set()
+        for unit in damaged:
+            if unit.stability > 0 or id(unit) in seen:
+                continue
+            seen.add(id(unit))
+            if events is not None:
+                events["death"].append([[unit.x, unit.y], unit._spec.index, new_id(unit), unit.player_index + 1, False])
+            units_lost[unit.player_index] += 1
+            game_map.delete_unit(unit)
+            removed = True
+        return removed
+
+    def __fill_unit_lists(self, frame, game_map, movers, new_id):
+        """
+        Fills in the p1Units and p2Units of a frame from the board.
+        """
+        unit_lists = (frame["p1Units"], frame["p2Units"])
+        for unit in game_map.stationary_units():
+            unit_lists[unit.player_index][unit._spec.index].append([unit.x, unit.y, unit.stability, new_id(unit)])
+        for mover in movers:
+            unit = mover.unit
+            unit_lists[unit.player_index][mover.spec.index].append([unit.x, unit.y, unit.stability, mover.unit_id])
+
+_IN_RANGE = {}
+_TABLES = {}
+
+def _in_range_table(radius):
+    """
+    A boolean array where [a, b] is set when tile b is in range of tile a, see tiles_in_range.
+    """
+    table = _IN_RANGE.get(radius)
+    if table is None:
+        table = np.zeros((ARENA_TILES, ARENA_TILES), dtype=bool)
+        for tile in range(ARENA_TILES):
+            table[tile, list(tiles_in_range(tile, radius))] = True
+        _IN_RANGE[radius] = table
+    return table
+
+def _geometry_tables():
+    """
+    The squared distance between every pair of tiles, and the rank of each tile in the tie breaks of
+    get_target for an attacker of each player.
+    """
+    if not _TABLES:
+        x = np.array(TILE_X, dtype=float)
+        y = np.array(TILE_Y, dtype=float)
+        _TABLES["distance"] = (x[:, None] - x[None, :])**2 + (y[:, None] - y[None, :])**2
+        for player_index, y_sign in ((0, 1), (1, -1)):
+            order = sorted(range(ARENA_TILES), key=lambda tile: (y_sign * TILE_Y[tile], -abs(HALF_ARENA - 0.5 - TILE_X[tile]), X_MAJOR_RANK[tile]))
+            rank = np.zeros(ARENA_TILES)
+            rank[order] = np.arange(ARENA_TILES)
+            _TABLES[player_index] = rank
+    return _TABLES
+
+def _first_best(candidates, *keys):
+    """
+    Picks along the last axis the first candidate with the lowest keys, compared in order. Returns the index
+    picked and whether there was any candidate.
+    """
+    for key in keys:
+        key = np.where(candidates, key, np.inf)
+        candidates = candidates & (key == key.min(axis=-1, keepdims=True))
+    return candidates.argmax(axis=-1), candidates.any(axis=-1)
+
+class BatchSimulator:
+    """Plays out the action phase of many deployments of information units against the same board at once
+
+    Every deployment is a scenario, and the units of all scenarios are advanced in lockstep as arrays with one row
+    per scenario, following the rules of ActionSimulator. The board, the range tables and the paths are shared by
+    every scenario. A scenario only gets paths of its own once one of its firewalls is destroyed, and those are
+    cached by the firewalls destroyed, so scenarios breaking through the same way share them too.
+
+    Only the deploying player has information units on the board. Scenarios play out like in ActionSimulator, except
+    for which of several units on the same tile with the same stability a destructor picks. Without numpy, each
+    scenario is run with an ActionSimulator instead.
+
+    Attributes:
+        * game_state (:obj: GameState): The board the action phase starts from
+        * player_index (int): The player deploying the units, 0 for you 1 for the enemy
+        * max_frames (int): The action phase is cut short after this many frames
+
+    """
+    def __init__(self, game_state, player_index=0, max_frames=1000):
+        """Prepares to simulate many deployments against a board
+
+        Args:
+            * game_state (:obj: GameState): The board at the start of the action phase
+            * player_index: The player deploying the units, 0 for you 1 for the enemy
+            * max_frames: The action phase is cut short after this many frames
+
+        """
+        self.game_state = game_state
+        self.player_index = player_index
+        self.max_frames = max_frames
+        self.__simulator = ActionSimulator(game_state, max_frames)
+        self.__paths = {}
+        self.__path_state = game_state.fork()
+        self.__path_state._shortest_path_finder = ShortestPathFinder()
+
+        mechanics = game_state.config["mechanics"]
+        self.__shield_decay = mechanics.get("shieldDecayPerFrame", 0)
+        self.__self_destruct_steps = mechanics.get("stepsRequiredSelfDestruct", 5)
+        self.__self_destruct_radius = mechanics.get("selfDestructRadius", 1.5)
+
+        if np is None:
+            return
+        game_map = game_state.game_map
+        unit_specs = game_state.unit_specs
+        enemy_index = 1 - player_index
+        self.__firewalls = [tile for tile in range(ARENA_TILES) if game_map.tile_occupied[tile] and game_map.tile_owner[tile] == enemy_index]
+        self.__firewall_tiles = np.array(self.__firewalls, dtype=int)
+        self.__firewall_stability = np.array([game_map.tile_stability[tile] for tile in self.__firewalls], dtype=float)
+        destructor_index = unit_specs.type_index[unit_specs.DESTRUCTOR]
+        self.__destructors = np.array([i for i, tile in enumerate(self.__firewalls) if game_map.tile_type[tile] == destructor_index], dtype=int)
+        self.__encryptor_tiles = np.array(list(tiles(game_map.get_bitboard(unit_specs.ENCRYPTOR, player_index))), dtype=int)
+
+    def run(self, deploy_stacks):
+        """Plays out the action phase for each of many deployments
+
+        Args:
+            * deploy_stacks: A list of deployments, each a list of (unit_type, x, y, count) entries like the _deploy_stack
+              of a GameState. Entries on blocked or invalid locations are skipped
+
+        Returns:
+            A BatchResult
+
+        """
+        if np is None or not deploy_stacks:
+            results = [self.__run_one(deploy_stack) for deploy_stack in deploy_stacks]
+            return BatchResult(*([getattr(result, name)[self.player_index] for result in results] for name in BatchResult._fields))
+
+        state = self.game_state
+        game_map = state.game_map
+        unit_specs = state.unit_specs
+        specs = unit_specs.specs
+        tables = _geometry_tables()
+        distance = tables["distance"]
+
+        # One slot per deployed unit, padded to the largest deployment
+        scenario_slots = []
+        for deploy_stack in deploy_stacks:
+            slots = []
+            for entry in deploy_stack:
+                unit_type, x, y = entry[:3]
+                count = entry[3] if len(entry) > 3 else 1
+                tile = tile_of([x, y])
+                spec = unit_specs.by_type.get(unit_type)
+                if tile == -1 or game_map.tile_occupied[tile] or spec is None or spec.stationary:
+                    continue
+                slots.extend([(spec.index, tile, state.get_target_edge([x, y]))] * count)
+            scenario_slots.append(slots)
+        scenarios = len(deploy_stacks)
+        width = max([len(slots) for slots in scenario_slots] + [1])
+        alive = np.zeros((scenarios, width), dtype=bool)
+        type_ids = np.zeros((scenarios, width), dtype=int)
+        edges = np.zeros((scenarios, width), dtype=int)
+        path_of = np.zeros((scenarios, width), dtype=int)
+        paths = _PathTable(self.__load_path)
+        for scenario, slots in enumerate(scenario_slots):
+            for slot, (type_id, tile, edge) in enumerate(slots):
+                alive[scenario, slot] = True
+                type_ids[scenario, slot] = type_id
+                edges[scenario, slot] = edge
+                path_of[scenario, slot] = paths.add((), tile, edge)
+        paths.build()
+
+        speed = np.array([spec.speed for spec in specs])[type_ids]
+        damage_f = np.array([spec.damage_f or 0 for spec in specs])[type_ids]
+        max_stability = np.array([spec.max_stability for spec in specs], dtype=float)[type_ids]
+        unit_ranges = np.array([spec.range for spec in specs])[type_ids]
+        stability = max_stability.copy()
+        shield = np.zeros((scenarios, width))
+        # The number of moves made when the current path was given, as a unit moves along its path from there
+        path_start = np.zeros((scenarios, width), dtype=int)
+        position = paths.tiles[path_of, 0]
+        rows = np.arange(scenarios)[:, None]
+
+        firewall_tiles = self.__firewall_tiles
+        firewall_stability = np.repeat(self.__firewall_stability[None, :], scenarios, axis=0)
+        firewall_alive = np.ones(firewall_stability.shape, dtype=bool)
+        firewall_distance = distance[:, firewall_tiles]
+        firewall_rank = tables[self.player_index][firewall_tiles]
+        firewalls_in_range = {radius: _in_range_table(radius)[:, firewall_tiles] for radius in set(spec.range for spec in specs if not spec.stationary)}
+        destructors = self.__destructors
+        destructor_spec = unit_specs.by_type[unit_specs.DESTRUCTOR]
+        destructor_tiles = firewall_tiles[destructors]
+        destructor_reach = _in_range_table(destructor_spec.range)[destructor_tiles]
+        destructor_distance = distance[destructor_tiles]
+        unit_rank = tables[1 - self.player_index]
+        encryptor_spec = unit_specs.by_type[unit_specs.ENCRYPTOR]
+        encryptor_reach = _in_range_table(encryptor_spec.range)[self.__encryptor_tiles]
+        shielded = np.zeros((scenarios, width, len(self.__encryptor_tiles)), dtype=bool)
+
+        breaches = np.zeros(scenarios, dtype=int)
+        damage_dealt = np.zeros(scenarios)
+        units_lost = np.zeros(scenarios, dtype=int)
+        rerouting = np.zeros(scenarios, dtype=bool)
+        frame_number = 0
+        while alive.any() and frame_number < self.max_frames:
+            frame_number += 1
+
+            # Shields
+            decaying = alive & (shield > 0)
+            lost = np.where(decaying, np.minimum(shield, self.__shield_decay), 0)
+            shield -= lost
+            stability -= lost
+            died = decaying & (stability <= 0)
+            units_lost += died.sum(axis=1)
+            alive &= ~died
+            if len(self.__encryptor_tiles):
+                new_shields = encryptor_reach[:, position].transpose(1, 2, 0) & ~shielded & alive[:, :, None]
+                shielded |= new_shields
+                gained = new_shields.sum(axis=2) * encryptor_spec.damage
+                shield += gained
+                stability += gained
+
+            # Units of scenarios that lost a firewall take new paths from where they stand
+            moves = np.floor(frame_number * speed + 1e-9).astype(int)
+            rerouting &= alive.any(axis=1)
+            if rerouting.any():
+                moved = np.floor((frame_number - 1) * speed + 1e-9).astype(int)
+                for scenario in np.flatnonzero(rerouting).tolist():
+                    destroyed = tuple(np.flatnonzero(~firewall_alive[scenario]).tolist())
+                    for slot in np.flatnonzero(alive[scenario]).tolist():
+                        path_of[scenario, slot] = paths.add(destroyed, int(position[scenario, slot]), int(edges[scenario, slot]))
+                        path_start[scenario, slot] = moved[scenario, slot]
+                paths.build()
+                rerouting[:] = False
+
+            # Moves, breaches and self destructs
+            step = np.maximum(moves - path_start, 0)
+            finished = alive & (step >= paths.end[path_of])
+            position = paths.tiles[path_of, np.minimum(step, paths.lengths[path_of] - 1)]
+            breaching = paths.breach[path_of]
+            breaches += (finished & breaching).sum(axis=1)
+            destructed = finished & ~breaching
+            units_lost += destructed.sum(axis=1)
+            alive &= ~finished
+            destructed &= path_start + paths.lengths[path_of] - 1 >= self.__self_destruct_steps
+            if destructed.any():
+                hits = np.einsum("su,sut->st", np.where(destructed, max_stability, 0), paths.self_destructs[path_of]) * firewall_alive
+                firewall_stability -= hits
+                damage_dealt += hits.sum(axis=1)
+                destroyed = firewall_alive & (firewall_stability <= 0)
+                rerouting |= destroyed.any(axis=1)
+                firewall_alive &= ~destroyed
+
+            # Attacks, all chosen before any damage is dealt
+            firewall_hits = np.zeros(firewall_stability.shape)
+            unit_hits = np.zeros(stability.shape)
+            attacking = alive & (damage_f > 0)
+            if attacking.any() and len(firewall_tiles):
+                # Only the units that can attack are compared with the firewalls
+                scenario_of, slot_of = np.nonzero(attacking)
+                attacker_position = position[scenario_of, slot_of]
+                attacker_ranges = unit_ranges[scenario_of, slot_of]
+                in_range = np.zeros((len(scenario_of), len(firewall_tiles)), dtype=bool)
+                for radius, reach in firewalls_in_range.items():
+                    in_range |= reach[attacker_position] & (attacker_ranges == radius)[:, None]
+                candidates = in_range & firewall_alive[scenario_of]
+                targets, found = _first_best(candidates, firewall_distance[attacker_position], firewall_stability[scenario_of], firewall_rank)
+                np.add.at(firewall_hits, (scenario_of[found], targets[found]), damage_f[scenario_of, slot_of][found])
+            if len(destructors):
+                candidates = (destructor_reach[:, position].transpose(1, 0, 2) & alive[:, None, :]
+                    & firewall_alive[:, destructors][:, :, None])
+                if candidates.any():
+                    targets, found = _first_best(candidates, destructor_distance[:, position].transpose(1, 0, 2),
+                        stability[:, None, :], unit_rank[position][:, None, :])
+                    np.add.at(unit_hits, (np.broadcast_to(rows, targets.shape)[found], targets[found]), destructor_spec.damage)
+            firewall_stability -= firewall_hits
+            damage_dealt += firewall_hits.sum(axis=1)
+            destroyed = firewall_alive & (firewall_stability <= 0)
+            rerouting |= destroyed.any(axis=1)
+            firewall_alive &= ~destroyed
+            stability -= unit_hits
+            died = alive & (stability <= 0)
+            units_lost += died.sum(axis=1)
+            alive &= ~died
+
+        return BatchResult(breaches.tolist(), damage_dealt.tolist(), units_lost.tolist())
+
+    def __run_one(self, deploy_stack):
+        """
+        Runs a single scenario with the ActionSimulator, for when numpy is missing.
+        """
+        if self.player_index == 0:
+            return self.__simulator.run(deploy_stack=deploy_stack, record=False)
+        return self.__simulator.run(enemy_deploy_stack=deploy_stack, record=False)
+
+    def __load_path(self, destroyed, tile, edge):
+        """
+        Gets the path from a tile to an edge once the given enemy firewalls are destroyed, the step it breaches
+        on or None, and which enemy firewalls a self destruct at its end would hit.
+        """
+        key = (destroyed, tile, edge)
+        loaded = self.__paths.get(key)
+        if loaded is None:
+            state = self.__path_state
+            checkpoint = state.checkpoint()
+            for index in destroyed:
+                state.game_map.remove_unit(list(TILE_LOCATIONS[self.__firewalls[index]]))
+            path = [tile_of(location) for location in state.find_path_to_edge(list(TILE_LOCATIONS[tile]), edge)]
+            state.rollback(checkpoint)
+            state.release(checkpoint)
+            # A unit breaches on the first edge tile it reaches, or self destructs trying to move past the end of its path
+            end = next((step for step in range(1, len(path)) if TILE_LOCATIONS[path[step]] in EDGE_LOCATION_SETS[edge]), None)
+            in_radius = set(tiles_in_range(path[-1], self.__self_destruct_radius))
+            loaded = (path, end, [firewall in in_radius for firewall in self.__firewalls])
+            self.__paths[key] = loaded
+        return loaded
+
+class _PathTable:
+    """
+    The paths the units of a BatchSimulator run follow, as arrays indexed by path id. Paths are padded with their
+    last tile. The end of a path is the step it breaches on, or its length for paths that end in a self destruct.
+    """
+    def __init__(self, load_path):
+        self.__load_path = load_path
+        self.__ids = {}
+        self.__paths = []
+        self.__built = 0
+
+    def add(self, destroyed, tile, edge):
+        key = (destroyed, tile, edge)
+        path_id = self.__ids.get(key)
+        if path_id is None:
+            path_id = len(self.__paths)
+            self.__ids[key] = path_id
+            self.__paths.append(self.__load_path(destroyed, tile, edge))
+        return path_id
+
+    def build(self):
+        """
+        Appends the paths added since the last build to the arrays.
+        """
+        new = self.__paths[self.__built:]
+        if not new:
+            return
+        self.__built = len(self.__paths)
+        longest = max(len(path) for path, _, _ in new)
+        if self.__built == len(new):
+            self.tiles = np.zeros((0, longest), dtype=int)
+            self.lengths = np.zeros(0, dtype=int)
+            self.breach = np.zeros(0, dtype=bool)
+            self.end = np.zeros(0, dtype=int)
+            self.self_destructs = np.zeros((0, len(new[0][2])))
+        elif longest > self.tiles.shape[1]:
+            self.tiles = np.pad(self.tiles, ((0, 0), (0, longest - self.tiles.shape[1])), mode="edge")
+        longest = self.tiles.shape[1]
+        self.tiles = np.concatenate([self.tiles, [path + [path[-1]] * (longest - len(path)) for path, _, _ in new]])
+        self.lengths = np.concatenate([self.lengths, [len(path) for path, _, _ in new]])
+        self.breach = np.concatenate([self.breach, [end is not None for _, end, _ in new]])
+        self.end = np.concatenate([self.end, [len(path) if end is None else end for path, end, _ in new]])
+        self.self_destructs = np.concatenate([self.self_destructs, np.array([hits for _, _, hits in new], dtype=float).reshape(len(new), -1)])
@@ -1,7 +1,17 @@
+import io
+import random
+import copy
+import contextlib
 import unittest
 import json
 from .game_state import GameState
-from .unit import GameUnit
+from .unit import GameUnit, compile_unit_specs
+from .util import GameMessage, load_state
+from .live_board import LiveBoard
+from .simulator import ActionSimulator, BatchSimulator
+from . import bitboard
+from .geometry import TILE_ID, range_stencil, tiles_in_range
+from .navigation import DynamicPathFinder, ShortestPathFinder, PathCache, field_to_grid
 from .advanced_game_state import AdvancedGameState
 
 class BasicTests(unittest.TestCase):
@@ -156,6 +166,70 @@ class BasicTests(unittest.TestCase):
         self.assertEqual(30, game.my_health, "My integrity is not working")
         self.assertEqual(30, game.enemy_health, "My opponent has no integrity!")
 
+    def test_decoded_state(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        turn = """{"p2Units":[[[13,27,60.0,"1"]],[],[],[],[],[],[]],"turnInfo":[0,3,-1],"p1Stats":[25.0,7.0,9.0,0],"p1Units":[[],[],[[13,0,70.0,"2"]],[],[],[],[[13,0,70.0,"2"]]],"p2Stats":[30.0,5.0,6.0,0],"events":{}}"""
+        from_string = GameState(game.config, turn)
+        from_dict = GameState(game.config, json.loads(turn))
+        for state in (from_string, from_dict):
+            self.assertEqual((3, 25.0, 9.0), (state.turn_number, state.my_health, state.get_resource(state.BITS)), "Stats should be read from a string or a dict")
+            self.assertEqual(("DF", True), (state.game_map[13, 0][0].unit_type, state.game_map[13, 0][0].pending_removal), "Units should be read from a string or a dict")
+            self.assertEqual(1, state.game_map[13, 27][0].player_index, "Enemy units should be read from a string or a dict")
+        decoded = json.loads(turn)
+        decoded["turnInfo"] = [0, 4, -1]
+        message = GameMessage(turn, decoded)
+        self.assertEqual(turn, message, "A GameMessage should still be the message string")
+        self.assertTrue(load_state(message) is decoded and load_state(decoded) is decoded, "Decoded messages should not be decoded again")
+        self.assertEqual(4, GameState(game.config, message).turn_number, "GameState should use the json attached to a GameMessage")
+
+    def test_lazy_state(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        turn = """{"p2Units":[[[13,27,60.0,"1"]],[],[],[],[],[],[]],"turnInfo":[0,3,-1],"p1Stats":[25.0,7.0,9.0,0],"p1Units":[[[12,1,60.0,"2"],[15,1,60.0,"3"]],[],[[13,0,70.0,"4"]],[],[],[],[]],"p2Stats":[30.0,5.0,6.0,0],"events":{}}"""
+        state = GameState(game.config, turn, lazy=True)
+        state.suppress_warnings(True)
+        self.assertEqual((3, 30.0, 7.0), (state.turn_number, state.enemy_health, state.get_resource(state.CORES)), "Stats should be read straight away")
+        self.assertEqual(7, state.number_affordable("FF"), "Resources should be read straight away")
+        self.assertEqual({"game_map": 0, "units": 0, "path_finder": 0}, state.materialized, "Nothing should be built before the map is used")
+        lazy_fork = state.fork()
+        self.assertTrue(state.contains_stationary_unit([13, 0]), "The map should be built when it is first used")
+        self.assertEqual({"game_map": 1, "units": 4, "path_finder": 0}, state.materialized, "The map should be built once")
+        self.assertFalse(state.game_map.enable_warnings, "The map should keep suppressed warnings")
+        state.find_path_to_edge([13, 27])
+        state.find_path_to_edge([14, 27])
+        self.assertEqual({"game_map": 1, "units": 4, "path_finder": 1}, state.materialized, "The pathfinder should be built once")
+        self.assertEqual(0, lazy_fork.materialized["game_map"], "Forking a lazy state should not build its map")
+        self.assertEqual(1, lazy_fork.game_map[13, 27][0].player_index, "A lazy fork should build the same map")
+        eager = GameState(game.config, turn)
+        self.assertEqual({"game_map": 1, "units": 4, "path_finder": 0}, eager.materialized, "The map should be built straight away when not lazy")
+
+    def test_incremental_state(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        first = """{"p2Units":[[[13,27,60.0,"1"]],[],[[14,26,70.0,"2"]],[],[],[],[]],"turnInfo":[0,3,-1],"p1Stats":[25.0,7.0,9.0,0],"p1Units":[[[12,1,60.0,"3"],[15,1,60.0,"4"]],[],[[13,0,70.0,"5"]],[],[],[],[]],"p2Stats":[30.0,5.0,6.0,0],"events":{}}"""
+        damaged = """{"p2Units":[[[13,27,60.0,"1"]],[],[[14,26,70.0,"2"]],[],[],[],[]],"turnInfo":[0,4,-1],"p1Stats":[25.0,7.0,9.0,0],"p1Units":[[[12,1,20.0,"3"],[15,1,60.0,"4"]],[],[[13,0,70.0,"5"]],[],[],[],[[15,1,0.0,"6"]]],"p2Stats":[30.0,5.0,6.0,0],"events":{}}"""
+        rebuilt = """{"p2Units":[[[13,27,60.0,"1"]],[],[[13,26,70.0,"7"]],[],[],[],[]],"turnInfo":[0,5,-1],"p1Stats":[25.0,7.0,9.0,0],"p1Units":[[[12,1,20.0,"3"]],[],[[13,0,70.0,"5"]],[],[],[],[]],"p2Stats":[30.0,5.0,6.0,0],"events":{}}"""
+        previous = GameState(game.config, first)
+        previous.suppress_warnings(True)
+        previous.find_path_to_edge([14, 1])
+        previous.attempt_spawn("FF", [10, 3])
+        state = GameState(game.config, damaged, previous=previous)
+        self.assertEqual([[12, 1]], state.delta[0]["damaged"], "Damaged units should be in the delta")
+        self.assertEqual([[15, 1]], state.delta[0]["removal"], "Units marked for removal should be in the delta")
+        self.assertEqual([], state.delta[0]["built"] + state.delta[1]["built"], "Nothing was built")
+        self.assertFalse(state.layout_changed, "Damage does not change the layout")
+        self.assertEqual((20.0, True), (state.game_map[12, 1][0].stability, state.game_map[15, 1][0].pending_removal), "The map should be updated")
+        self.assertEqual([], state.game_map[10, 3], "Units spawned on the previous turn should not be on the map")
+        self.assertTrue(state._shortest_path_finder is previous._shortest_path_finder, "The pathfinder should be reused when the layout is unchanged")
+        self.assertEqual(1, len(previous.game_map[10, 3]), "The previous turn should keep its map")
+        self.assertEqual(0, state.materialized["units"], "Unchanged units should not be placed again")
+
+        state = GameState(game.config, rebuilt, previous=state)
+        self.assertEqual(([[13, 26]], [[14, 26]]), (state.delta[1]["built"], state.delta[1]["destroyed"]), "Built and destroyed units should be in the delta")
+        self.assertEqual([[15, 1]], state.delta[0]["destroyed"], "Removed units should be destroyed")
+        self.assertTrue(state.layout_changed, "The layout changed")
+        full = GameState(game.config, rebuilt)
+        for location in full.game_map:
+            self.assertEqual(str(full.game_map[location]), str(state.game_map[location]), "The updated map should match a new one")
+
     def test_spawning(self, adv=False):
         game = self.make_turn_0_map(adv)
         self.assertEqual(True, game.attempt_spawn("SI", [[13, 0]]), "We cannot spawn a soldier!")
@@ -164,7 +238,18 @@ class BasicTests(unittest.TestCase):
         self.assertEqual(True, game.attempt_spawn("DF", [[13, 6]]), "We cannot spawn a tower!")
         self.assertEqual(2, game.attempt_spawn("SI", [[13, 0], [13, 0], [13, 5]]), "More or less than 2 units were spawned!")
         self.assertEqual([("DF", 13, 6)], game._build_stack, "Build queue is wrong!")
-        self.assertEqual([("SI", 13, 0), ("SI", 13, 0), ("SI", 13, 0)], game._deploy_stack, "Deploy queue is wrong!")
+        self.assertEqual([("SI", 13, 0, 1), ("SI", 13, 0, 1), ("SI", 13, 0, 1)], game._deploy_stack, "Deploy queue is wrong!")
+
+    def test_bulk_deploy(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        self.assertEqual(5, game.attempt_spawn("PI", [13, 0], 1000), "Only 5 pings are affordable")
+        self.assertEqual(0, game.attempt_spawn("PI", [14, 0], 1000), "No bits should be left")
+        self.assertEqual((0, 5), (game.get_resource(game.BITS), len(game.game_map[13, 0])), "The pings should be paid for and placed at once")
+        self.assertEqual([("PI", 13, 0, 5)], game._deploy_stack, "The deployment should be queued as a count")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            game.submit_turn()
+        self.assertEqual('[]\n' + json.dumps([["PI", 13, 0]] * 5) + '\n', output.getvalue(), "Each unit should still be submitted")
 
     def test_trivial_functions(self, adv=False):
         game = self.make_turn_0_map(adv)
@@ -176,6 +261,17 @@ class BasicTests(unittest.TestCase):
         self.assertEqual(0, len(game.game_map.get_locations_in_range([-500,-500], 10)), "Invalid tiles are being marked as in range")
         self.assertEqual(1, len(game.game_map.get_locations_in_range([13,13], 0)), "A location should be in range of itself")
     
+    def test_arena_geometry(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        self.assertEqual(420, len(list(game.game_map)), "There should be 420 tiles in the arena")
+        self.assertEqual([13, 0], next(iter(game.game_map)), "Iteration should start at the bottom of the arena")
+        self.assertTrue(game.game_map.in_arena_bounds([0, 13]), "The left corner should be in bounds")
+        self.assertTrue(game.game_map.in_arena_bounds([14, 27]), "The top corner should be in bounds")
+        self.assertFalse(game.game_map.in_arena_bounds([0, 12]), "Locations below the left corner should be out of bounds")
+        self.assertFalse(game.game_map.in_arena_bounds([28, 13]), "Locations past the right corner should be out of bounds")
+        self.assertEqual([13, 0], game.game_map.get_edge_locations(game.game_map.BOTTOM_LEFT)[0], "The bottom left edge should start at the bottom")
+        self.assertEqual([0, 13], game.game_map.get_edges()[game.game_map.BOTTOM_LEFT][-1], "The bottom left edge should end at the left corner")
+
     def test_get_units(self, adv=False):
         game = self.make_turn_0_map(adv)
         self.assertEqual(0, len(game.game_map[13,13]), "There should not be a unit on this location")
@@ -185,11 +281,125 @@ class BasicTests(unittest.TestCase):
         for _ in range(3):
             game.game_map.add_unit("FF", [13,13])
         self.assertEqual(1, len(game.game_map[13,13]), "Towers seem to be stacking")
-        
+
+    def test_bitboards(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        game.game_map.add_unit("DF", [13, 14], 1)
+        game.game_map.add_unit("DF", [20, 15], 1)
+        game.game_map.add_unit("DF", [13, 17], 1)
+        game.game_map.add_unit("FF", [14, 14], 1)
+        game.game_map.add_unit("DF", [13, 13], 0)
+        game.game_map.add_unit("PI", [13, 0], 0)
+        game.game_map.add_unit("PI", [13, 0], 0)
+
+        front = bitboard.rows_mask([14, 15])
+        self.assertEqual(2, bitboard.count(game.game_map.get_bitboard("DF", 1) & front), "There should be two enemy destructors in the front rows")
+        self.assertEqual(3, bitboard.count(game.game_map.get_bitboard(None, 1) & front), "There should be three enemy firewalls in the front rows")
+        self.assertEqual([[13, 13], [13, 14], [13, 17]], bitboard.locations(game.game_map.get_bitboard("DF") & bitboard.columns_mask([13])), "Both players' destructors should be found")
+        self.assertEqual([[13, 0]], bitboard.locations(game.game_map.get_bitboard("PI", 0)), "Stacked information units share a bit")
+        self.assertEqual(5, bitboard.count(game.game_map.walls), "Information units are not walls")
+        self.assertEqual(0, game.game_map.get_bitboard("DF", 0) & bitboard.HALF_MASKS[1], "Our destructor is on our half")
+
+        game.game_map.remove_unit([13, 14])
+        game.game_map.remove_unit([13, 0])
+        self.assertEqual(1, bitboard.count(game.game_map.get_bitboard("DF", 1) & front), "Removing a unit should clear its bit")
+        self.assertEqual(0, game.game_map.get_bitboard("PI"), "Removing information units should clear their bit")
+        self.assertEqual(bitboard.location_mask([[20, 15], [13, 17], [14, 14], [13, 13]]), game.game_map.walls, "The walls bitboard should follow removals")
+
+    def test_map_columns(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        game_map = game.game_map
+        game_map.add_units("DF", [[13, 13, 20.0], [14, 13, 0.0]], 1)
+        game_map.add_unit("PI", [12, 12], 0)
+        tile = TILE_ID[13][13]
+        self.assertEqual(1, game_map.tile_occupied[tile], "Stationary units should fill the columns")
+        self.assertEqual(("DF", 1, 20.0), (game_map.unit_types[game_map.tile_type[tile]], game_map.tile_owner[tile], game_map.tile_stability[tile]), "The columns should hold the parsed unit")
+        self.assertEqual(75, game_map[14, 13][0].stability, "A stability of 0 should mean max stability")
+        self.assertEqual(0, game_map.tile_occupied[TILE_ID[12][12]], "Information units are not stored in the columns")
+
+        view = game_map[13, 13][0]
+        self.assertTrue(isinstance(view, GameUnit), "Map locations should still hold GameUnits")
+        self.assertTrue(view is game.contains_stationary_unit([13, 13]), "Views should be reused until the tile changes")
+        view.stability -= 5
+        view.pending_removal = True
+        self.assertEqual(15, game_map.tile_stability[tile], "Changing a view should change the columns")
+        self.assertEqual(1, game_map.tile_pending_removal[tile], "Changing a view should change the columns")
+        view.player_index = 0
+        self.assertEqual(0, game_map.get_bitboard("DF", 1) & (1 << tile), "Changing the owner should move the unit between bitboards")
+
+        game_map.remove_unit([13, 13])
+        self.assertEqual(0, game_map.tile_occupied[tile], "Removing a unit should clear the columns")
+        self.assertEqual((15, 0, True), (view.stability, view.player_index, view.pending_removal), "Removed views should keep their last values")
+        game_map[13, 13] = [view]
+        self.assertEqual("Friendly DF, stability: 15.0 location: [13, 13], pending removal ", str(game_map[13, 13][0]), "Units should be copied into the columns")
+        self.assertEqual((None, None, []), (game_map.add_unit("FF", [12, 13], 2), game_map.add_unit("PI", [12, 13], -1), game_map[12, 13]), "Units of invalid players should not be added")
+
+    def test_tile_list(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        game_map = game.game_map
+        game_map.add_unit("PI", [13, 12], 0)
+        units = game_map[13, 12]
+        units.append(GameUnit("SI", game.config, 0, None, 13, 12))
+        self.assertEqual(["PI", "SI"], [unit.unit_type for unit in game_map[13, 12]], "Appending to a tile should change the map")
+        del units[0]
+        self.assertEqual(["SI"], [unit.unit_type for unit in game_map[13, 12]], "Deleting from a tile should change the map")
+        units.clear()
+        self.assertEqual(0, len(game_map[13, 12]), "Clearing a tile should change the map")
+
+        game_map.add_unit("DF", [13, 13], 0)
+        units = game_map[13, 13]
+        units.remove(units[0])
+        self.assertFalse(game.contains_stationary_unit([13, 13]), "Removing a tower from its tile should update the columns")
+        units.append(GameUnit("FF", game.config, 1, None, 13, 13))
+        self.assertEqual(1, game_map.tile_owner[TILE_ID[13][13]], "Adding a tower to a tile should update the columns")
+        units[0].stability = 10
+        self.assertEqual(10, game_map.tile_stability[TILE_ID[13][13]], "Units in the list should stay views of the columns")
+
+    def test_map_iteration(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        game_map = game.game_map
+        pairs = sum(1 for _ in game_map for _ in game_map)
+        self.assertEqual(420 * 420, pairs, "Nested loops over the map should not share a cursor")
+        self.assertEqual(list(game_map)[:210], list(game_map.half_locations(0)), "Our half should be the bottom of the arena")
+        self.assertTrue(all(y >= 14 for _, y in game_map.half_locations(1)), "The enemy half should be the top of the arena")
+
+        game_map.add_unit("DF", [13, 20], 1)
+        game_map.add_unit("FF", [3, 12], 0)
+        game_map.add_unit("PI", [13, 0], 0)
+        game_map.add_unit("PI", [13, 0], 0)
+        self.assertEqual([[13, 0], [3, 12], [13, 20]], list(game_map.occupied_locations()), "Occupied locations should be in map order")
+        self.assertEqual([[13, 0], [3, 12]], list(game_map.occupied_locations(0)), "Occupied locations should respect the player")
+        self.assertEqual(["FF", "DF"], [unit.unit_type for unit in game_map.stationary_units()], "Information units are not stationary")
+        self.assertEqual([[13, 20]], [[unit.x, unit.y] for unit in game_map.stationary_units(1)], "Stationary units should respect the player")
+
     def test_get_units_in_range(self, adv=False):
         game = self.make_turn_0_map(adv)
         self.assertEqual(1, len(game.game_map.get_locations_in_range([13,13], 0)), "We should be in 0 range of ourself")
         self.assertEqual(37, len(game.game_map.get_locations_in_range([13,13], 3)), "Wrong number of tiles in range")
+        self.assertEqual(5, len(game.game_map.get_locations_in_range([0,13], 1.5)), "Locations out of the arena should not be in range")
+        self.assertTrue(tiles_in_range(TILE_ID[13][13], 3) is tiles_in_range(TILE_ID[13][13], 3.0), "Tiles in range should be cached")
+        self.assertEqual(len(range_stencil(3)), len(tiles_in_range(TILE_ID[13][13], 3)), "Tiles far from the edges should use the whole stencil")
+
+    def test_spatial_index(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        game_map = game.game_map
+        game_map.add_units("DF", [[13, 16, 0], [20, 20, 0], [5, 14, 0]], 1)
+        game_map.add_unit("DF", [13, 12], 0)
+        game_map.add_unit("FF", [12, 15], 1)
+        game_map.add_unit("PI", [13, 13], 1)
+        self.assertEqual([[5, 14], [13, 16], [20, 20]], [[unit.x, unit.y] for unit in game_map.get_all_units("DF", 1)], "We should find every enemy destructor")
+        self.assertEqual(6, len(game_map.get_all_units()), "We should find every unit")
+
+        in_range = game_map.get_units_in_range([13, 13], 3, player_index=1)
+        self.assertEqual(["FF", "PI", "DF"], [unit.unit_type for unit in in_range], "Units in range should be in the order of their locations")
+        self.assertEqual([[13, 16]], [[unit.x, unit.y] for unit in game_map.get_units_in_range([13, 13], 3, "DF", 1)], "Units in range should respect the type")
+        self.assertEqual(1, len(game.get_attackers([13, 13], 0)), "Only one enemy destructor is in range")
+
+        self.assertEqual([13, 13], [game_map.get_nearest_unit([13, 10], None, 1).x, game_map.get_nearest_unit([13, 10], None, 1).y], "The nearest enemy unit is the ping")
+        self.assertEqual([5, 14], [game_map.get_nearest_unit([0, 13], "DF").x, game_map.get_nearest_unit([0, 13], "DF").y], "The nearest destructor is on the left")
+        self.assertEqual(None, game_map.get_nearest_unit([13, 10], "EF"), "There are no encryptors")
+        game_map.remove_unit([13, 13])
+        self.assertEqual("FF", game_map.get_nearest_unit([13, 10], None, 1).unit_type, "Removed units should leave the index")
 
     def _test_get_attackers(self):
         game = self.make_turn_0_map(True)
@@ -207,6 +417,239 @@ class BasicTests(unittest.TestCase):
         game.game_map.add_unit("DF", [14,14], 1)
         self.assertEqual(3, len(game.get_attackers([13,13], 0)), "We should be in danger from 3 places")
 
+    def test_threat_map(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        game.game_map.add_unit("DF", [13, 16], 1)
+        game.game_map.add_unit("DF", [14, 16], 1)
+        game.game_map.add_unit("DF", [13, 10], 0)
+        threats = game.get_threat_map(0)
+        for location in game.game_map:
+            self.assertEqual(len(game.get_attackers(location, 0)) * 4.0, threats[TILE_ID[location[0]][location[1]]], "The threat map should match get_attackers")
+        self.assertEqual(4.0, game.get_threat_map(1)[TILE_ID[13][12]], "Both players should have a threat map")
+        path = [[13, 13], [13, 14], [13, 15]]
+        self.assertEqual(sum(len(game.get_attackers(location, 0)) * 4.0 for location in path), game.get_path_damage(path), "Path damage should be summed along the path")
+        checkpoint = game.checkpoint()
+        fork = game.fork()
+        game.attempt_spawn("DF", [13, 12])
+        game.game_map.remove_unit([13, 16])
+        self.assertEqual((4.0, 4.0), (game.get_threat_map(0)[TILE_ID[13][14]], game.get_threat_map(1)[TILE_ID[13][14]]), "The threat map should follow spawns and removals")
+        self.assertEqual((8.0, 0.0), (fork.get_threat_map(0)[TILE_ID[13][14]], fork.get_threat_map(1)[TILE_ID[13][14]]), "Forks should keep their own threat maps")
+        game.rollback(checkpoint)
+        self.assertEqual(threats, game.get_threat_map(0), "Rolling back should restore the threat map")
+
+    def test_get_targets(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        game_map = game.game_map
+        game_map.add_unit("DF", [13, 10], 0)
+        game_map.add_unit("FF", [13, 11], 1)
+        game_map.add_unit("PI", [13, 12], 1)
+        game_map.add_unit("DF", [5, 10], 0)
+        game_map.add_unit("PI", [5, 12], 1)
+        game_map.add_unit("PI", [5, 11], 1)
+        game_map.add_unit("DF", [20, 10], 0)
+        game_map.add_unit("PI", [20, 12], 1, 5.0)
+        game_map.add_unit("PI", [18, 10], 1, 10.0)
+        game_map.add_unit("DF", [24, 13], 0)
+        game_map.add_unit("PI", [23, 14], 1)
+        game_map.add_unit("PI", [25, 12], 1)
+        game_map.add_unit("SI", [13, 3], 0)
+        game_map.add_unit("FF", [13, 4], 1)
+        game_map.add_unit("DF", [8, 6], 0)
+        attackers = [game_map[13, 10][0], game_map[5, 10][0], game_map[20, 10][0], game_map[24, 13][0], game_map[13, 3][0], game_map[8, 6][0], game_map[13, 12][0]]
+        targets = game.get_targets(attackers)
+        self.assertEqual([("PI", 13, 12), ("PI", 5, 11), ("PI", 20, 12), ("PI", 25, 12), None, None, ("DF", 13, 10)],
+            [target and (target.unit_type, target.x, target.y) for target in targets],
+            "Targets should prefer information units, then the nearest, the weakest and the lowest")
+        for attacker, target in zip(attackers, targets):
+            self.assertTrue(target is game.get_target(attacker), "get_targets should agree with get_target for {}".format(attacker))
+        self.assertEqual([], game.get_targets([]), "No attackers should have no targets")
+
+    def test_fork(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        game.game_map.add_unit("DF", [13, 12], 0)
+        game.game_map.add_unit("PI", [13, 0], 0)
+        fork = game.fork()
+        self.assertEqual(type(game), type(fork), "Forks should keep the class of the game state")
+        self.assertEqual(game.game_map.walls, fork.game_map.walls, "Forks should start with the same walls")
+
+        fork.attempt_spawn("FF", [[14, 2], [11, 10]])
+        fork.game_map[13, 12][0].stability = 1
+        fork.game_map[13, 0][0].stability = 2
+        fork.game_map.remove_unit([13, 12])
+        self.assertEqual([], game._build_stack, "Spawning on a fork should not queue units on the original")
+        self.assertEqual(25, game.get_resource(game.CORES), "Spawning on a fork should not spend our cores")
+        self.assertEqual(23, fork.get_resource(fork.CORES), "Spawning on a fork should spend its cores")
+        self.assertEqual(75, game.game_map[13, 12][0].stability, "Changing a fork should not change the original")
+        self.assertEqual(15, game.game_map[13, 0][0].stability, "Forks should copy information units")
+        self.assertEqual(1, len(game.game_map.get_all_units("DF")), "Removing a unit from a fork should not remove it from the original")
+        self.assertNotEqual(game.find_path_to_edge([13, 0]), fork.find_path_to_edge([13, 0]), "Forks should path around their own walls")
+
+        game.game_map.add_unit("EF", [12, 12], 0)
+        self.assertEqual([], fork.game_map[12, 12], "Changing the original should not change its forks")
+        second = fork.fork()
+        second.game_map.add_unit("DF", [5, 10], 0)
+        self.assertEqual([], fork.game_map[5, 10], "Forks of forks should be independent")
+        self.assertEqual(2, len(second.game_map.get_all_units("FF")), "Forks of forks should keep their parent's units")
+
+    def test_rollback(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        game.game_map.add_unit("DF", [13, 12], 0)
+        game.game_map.add_unit("PI", [14, 0], 0)
+        destructor = game.game_map[13, 12][0]
+        walls = game.game_map.walls
+        path = game.find_path_to_edge([13, 0])
+
+        start = game.checkpoint()
+        game.attempt_spawn("FF", [[13, 1], [12, 12]])
+        game.attempt_spawn("PI", [14, 0], 2)
+        game.attempt_remove([13, 12])
+        destructor.stability = 10
+        destructor.player_index = 1
+        middle = game.checkpoint()
+        game.game_map.remove_unit([13, 12])
+        game.game_map[14, 0] = []
+        self.assertEqual([], game.game_map[14, 0], "The tile should be empty before rolling back")
+
+        game.rollback(middle)
+        self.assertEqual(2, len(game.game_map.get_all_units("FF")), "Rolling back should keep changes before the checkpoint")
+        self.assertEqual(3, len(game.game_map[14, 0]), "Rolling back should restore information units")
+        self.assertEqual(("DF", 10), (game.game_map[13, 12][0].unit_type, game.game_map[13, 12][0].stability), "Rolling back should restore removed units")
+
+        game.rollback(start)
+        self.assertEqual(walls, game.game_map.walls, "Rolling back should restore the walls")
+        self.assertEqual((75, 0), (game.game_map[13, 12][0].stability, game.game_map[13, 12][0].player_index), "Rolling back should restore changed units")
+        self.assertEqual(0, len(game.game_map.get_all_units(None, 1)), "Rolling back should restore owners")
+        self.assertEqual(1, len(game.game_map[14, 0]), "Rolling back should remove spawned units")
+        self.assertEqual(([], []), (game._build_stack, game._deploy_stack), "Rolling back should empty the queues")
+        self.assertEqual((25, 5), (game.get_resource(game.CORES), game.get_resource(game.BITS)), "Rolling back should refund resources")
+        self.assertEqual(path, game.find_path_to_edge([13, 0]), "Paths should match the restored walls")
+
+        game.attempt_spawn("EF", [10, 10])
+        game.rollback(start)
+        self.assertEqual([], game.game_map[10, 10], "Checkpoints should be reusable")
+
+        destructor = game.game_map[13, 12][0]
+        destructor.stability = 1
+        game.rollback(start)
+        self.assertEqual(75, destructor.stability, "Views of units that were not removed should stay attached")
+
+        game.release(start)
+        self.assertEqual(None, game.game_map._GameMap__journal, "Releasing the first checkpoint should drop the journal")
+        game.attempt_spawn("EF", [10, 10])
+        self.assertEqual(None, game.game_map._GameMap__journal, "Changes after the release should not be recorded")
+        start = game.checkpoint()
+        game.attempt_spawn("FF", [11, 10])
+        game.rollback(start)
+        game.release(start)
+        self.assertEqual((None, "EF", []), (game.game_map._GameMap__journal, game.game_map[10, 10][0].unit_type, game.game_map[11, 10]), "A balanced checkpoint and rollback should leave no journal")
+
+    def test_pathing(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        for x in range(2, 24):
+            game.game_map.add_unit("FF", [x, 11], 0)
+        expected_path = [[13, 0], [13, 1], [14, 1], [14, 2], [15, 2], [15, 3], [16, 3], [16, 4], [17, 4], [17, 5], [18, 5], [18, 6], [19, 6], [19, 7],
+            [20, 7], [20, 8], [21, 8], [21, 9], [22, 9], [22, 10], [23, 10], [24, 10], [24, 11], [25, 11], [25, 12], [26, 12], [26, 13], [27, 13], [27, 14]]
+        self.assertEqual(expected_path, game.find_path_to_edge([13, 0]), "Units should path through the gap in the wall")
+        self.assertEqual(None, game.find_path_to_edge([10, 11]), "We should not path from a blocked location")
+
+        for x in range(24, 26):
+            game.game_map.add_unit("FF", [x, 11], 0)
+        self.assertEqual(expected_path[:22], game.find_path_to_edge([13, 0]), "Units with no path to the edge should stop at the most ideal tile")
+
+    def test_batch_pathing(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        for x in range(2, 26):
+            game.game_map.add_unit("FF", [x, 11], 0)
+        starts = [[13, 0], [10, 11], [14, 0], [3, 12], [24, 10], [20, 20]]
+        paths = game.find_paths_to_edge(starts)
+        self.assertEqual([game.find_path_to_edge(start) for start in starts], paths, "Batched paths should match single paths")
+        self.assertEqual(None, paths[1], "We should not path from a blocked location")
+        edge_paths = game.find_paths_to_edge(starts, game.game_map.TOP_LEFT)
+        self.assertEqual([game.find_path_to_edge(start, game.game_map.TOP_LEFT) for start in starts], edge_paths, "Batched paths should respect the target edge")
+
+    def test_path_cache(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        cache = game._shortest_path_finder.cache
+        cache.clear()
+        empty_walls = game.game_map.walls
+        game.game_map.add_unit("FF", [13, 5], 0)
+        self.assertNotEqual(empty_walls, game.game_map.walls, "Adding a wall should change the walls bitboard")
+        game.game_map.add_unit("PI", [13, 6], 0)
+        game.game_map.add_unit("DF", [13, 5], 0)
+        walls = game.game_map.walls
+
+        first_path = game.find_path_to_edge([13, 4])
+        self.assertEqual(1, cache.misses, "A new wall layout should miss the cache")
+        self.assertEqual(first_path, game.find_path_to_edge([13, 4]), "Cached paths should not change")
+        self.assertEqual(1, cache.hits, "The same wall layout should hit the cache")
+
+        game.game_map.remove_unit([13, 5])
+        self.assertEqual(empty_walls, game.game_map.walls, "Removing every wall should restore the empty bitboard")
+        self.assertNotEqual(first_path, game.find_path_to_edge([13, 4]), "Removing a wall should not return a stale path")
+        game.game_map.add_unit("EF", [13, 5], 1)
+        self.assertEqual(walls, game.game_map.walls, "The walls bitboard should not depend on the type of wall")
+
+    def test_dynamic_pathing(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        for x in range(2, 24):
+            game.game_map.add_unit("FF", [x, 11], 0)
+        end_points = game.game_map.get_edge_locations(game.game_map.TOP_RIGHT)
+        finder = DynamicPathFinder(game, end_points)
+        self.assertEqual(game.find_path_to_edge([13, 0]), finder.navigate([13, 0]), "The dynamic finder should start from the current walls")
+
+        for location in [[22, 9], [24, 11], [25, 11], [24, 11], [23, 10], [22, 9]]:
+            blocked = not game.contains_stationary_unit(location)
+            finder.set_blocked(location, blocked)
+            if blocked:
+                game.game_map.add_unit("FF", location, 0)
+            else:
+                game.game_map.remove_unit(location)
+            self.assertEqual(game.find_path_to_edge([13, 0]), finder.navigate([13, 0]), "Repaired paths should match a full search after toggling {}".format(location))
+        self.assertTrue(finder.repairs > 0, "Single wall changes should be repaired in place")
+
+    def test_dynamic_pathing_entry_points(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        for x in range(2, 24):
+            game.game_map.add_unit("FF", [x, 11], 0)
+        top_right = game.game_map.get_edge_locations(game.game_map.TOP_RIGHT)
+        finder = DynamicPathFinder(game, top_right)
+        cached_fields = game._shortest_path_finder.edge_fields(game)
+
+        self.assertEqual(game.find_path_to_edge([13, 0]), finder.navigate_multiple_endpoints([13, 0], top_right, game), "Paths should match before any changes")
+        self.assertEqual(cached_fields, finder.edge_fields(game), "Edge fields should match before any changes")
+        finder.set_blocked([24, 11])
+        finder.set_blocked([25, 11])
+        game.game_map.add_unit("FF", [24, 11], 0)
+        game.game_map.add_unit("FF", [25, 11], 0)
+        self.assertEqual(game.find_path_to_edge([13, 0]), finder.navigate_multiple_endpoints([13, 0], top_right, game), "set_blocked should still work after navigate_multiple_endpoints")
+        self.assertEqual(game.find_path_to_edge([13, 0], game.game_map.BOTTOM_LEFT),
+            finder.navigate_multiple_starts([[13, 0]], game.game_map.get_edge_locations(game.game_map.BOTTOM_LEFT))[0], "Switching end points should search again")
+        self.assertEqual(game._shortest_path_finder.edge_fields(game), finder.edge_fields(game, vectorized=True), "Edge fields should use the hypothetical walls")
+        finder.set_blocked([23, 10])
+
+        game.game_map.remove_unit([24, 11])
+        game.game_map.remove_unit([25, 11])
+        self.assertEqual(cached_fields, game._shortest_path_finder.edge_fields(game), "Hypothetical walls should not change the cached fields")
+
+    def test_edge_fields(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        for x in range(2, 24):
+            game.game_map.add_unit("FF", [x, 11], 0)
+        fields = game._shortest_path_finder.edge_fields(game)
+        self.assertEqual(4, len(fields), "There should be a field for each edge")
+        grid = field_to_grid(fields[game.game_map.TOP_RIGHT])
+        self.assertEqual(0, grid[27][14], "Edge tiles should be 0 steps from their edge")
+        self.assertEqual(28, grid[13][0], "[13, 0] should be 28 steps from the top right edge")
+        self.assertEqual(-1, grid[10][11], "Blocked tiles should not have a pathlength")
+        self.assertEqual(-1, grid[0][0], "Tiles outside of the arena should not have a pathlength")
+
+        finder = ShortestPathFinder()
+        finder.cache = PathCache()
+        self.assertEqual(fields, finder.edge_fields(game, vectorized=True), "The vectorized search should match the tile search")
+        for edge in range(4):
+            self.assertEqual(game.find_path_to_edge([13, 0], edge), finder.navigate_multiple_endpoints([13, 0], game.game_map.get_edge_locations(edge), game),
+                "Paths walked from edge fields should not change")
+
     def test_print_unit(self, adv=False):
         game = self.make_turn_0_map(adv)
 
@@ -215,6 +658,150 @@ class BasicTests(unittest.TestCase):
         expected_string = "Enemy FF, stability: 60.0 location: [14, 13] "
         self.assertEqual(got_string, expected_string, "Expected {} from print_unit test got {} ".format(expected_string, got_string))
 
+    def test_unit_specs(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        specs = game.unit_specs
+        self.assertTrue(specs is compile_unit_specs(game.config), "Unit specs should be compiled once per config")
+        self.assertEqual(("FF", "EF", "DF"), specs.FIREWALL_TYPES, "The first three types should be firewalls")
+        self.assertEqual((10.0, 4.0), (specs.by_type["EF"].damage, specs.by_type["DF"].damage), "Encryptors should use their shield amount as damage")
+        self.assertEqual((game.BITS, game.CORES), (specs.by_type["PI"].resource, specs.by_type["FF"].resource), "Information costs bits and firewalls cost cores")
+        self.assertEqual("RM", specs.unit_types[6], "Remove should be the last type")
+        self.assertFalse("RM" in specs.by_type, "Remove is not a unit that can be spawned")
+        unit = GameUnit("EI", game.config)
+        self.assertEqual((0.25, 5.0, 3.0, 3.0), (unit.speed, unit.range, unit.damage_f, unit.cost), "Units should read their stats from the specs")
+
+    def test_unit_slots(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        game.game_map.add_unit("PI", [13, 0], 0)
+        game.game_map.add_unit("PI", [14, 0], 1)
+        game.game_map.add_unit("DF", [13, 1], 0)
+        ping, enemy_ping = game.game_map[13, 0][0], game.game_map[14, 0][0]
+        destructor = game.game_map[13, 1][0]
+        self.assertFalse(hasattr(ping, "__dict__") or hasattr(destructor, "__dict__"), "Units should not have a __dict__")
+        self.assertTrue(ping._spec is enemy_ping._spec, "Units of one type should share their spec")
+        self.assertTrue(ping.config is game.config and destructor.config is game.config, "Units should give the config they were made with")
+        self.assertEqual((1, 15.0, 0), (enemy_ping.player_index, ping.stability, destructor.speed), "Units should keep their attributes")
+        copied = copy.deepcopy(game.game_map[13, 0][0])
+        self.assertEqual(("PI", 13, 0, 15.0), (copied.unit_type, copied.x, copied.y, copied.stability), "Units should survive a deep copy")
+
+    def test_live_board(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        turn = """{"p2Units":[[[13,27,60.0,"1"]],[],[[14,20,75.0,"2"]],[],[],[],[]],"turnInfo":[0,3,-1],"p1Stats":[25.0,7.0,9.0,0],"p1Units":[[[12,1,60.0,"3"],[15,1,60.0,"4"]],[],[[13,0,75.0,"5"]],[],[],[],[]],"p2Stats":[30.0,5.0,6.0,0],"events":{}}"""
+        state = GameState(game.config, turn)
+        state.suppress_warnings(True)
+        state.attempt_spawn("DF", [10, 3])
+        board = LiveBoard(state)
+        state.attempt_spawn("PI", [14, 0])
+        self.assertEqual([], board.game_state.game_map[10, 3], "Units spawned on the turn should wait for the first frame")
+        frame = """{"p2Units":[],"turnInfo":[1,3,%d],"p1Stats":[25.0,1.0,4.0,0],"p1Units":[],"p2Stats":[%s,5.0,6.0,0],"events":%s}"""
+        board.apply_frame(frame % (0, "30.0", """{"spawn":[[[10,3],2,"6",1],[[14,0],3,"7",1],[[14,0],3,"8",1],[[15,1],6,"9",1]],"move":[],"damage":[],"shield":[],"death":[]}"""))
+        game_map = board.game_state.game_map
+        self.assertEqual(("DF", 2, True), (game_map[10, 3][0].unit_type, len(game_map[14, 0]), game_map[15, 1][0].pending_removal), "Spawn events should add units")
+        self.assertEqual((0, 1.0), (board.frame, board.game_state.get_resource(state.CORES)), "Stats should be read from the frame")
+        board.apply_frame(frame % (1, "30.0", """{"spawn":[],"move":[[[14,0],[14,1],[-1,-1],3,"7",1]],"damage":[[[13,27],20.0,0,"1",2]],"shield":[[[12,1],[14,1],3.0,1,"10","7",1]],"death":[[[12,1],0,"3",1,false]]}"""))
+        self.assertEqual((1, 1), (len(game_map[14, 0]), len(game_map[14, 1])), "Move events should move units")
+        self.assertEqual((18.0, 40.0), (game_map[14, 1][0].stability, game_map[13, 27][0].stability), "Shield and damage events should change stability")
+        self.assertEqual([], game_map[12, 1], "Death events should remove units")
+        board.apply_frame(frame % (2, "29.0", """{"spawn":[],"move":[],"damage":[],"shield":[],"death":[[[14,1],3,"7",1,false],[[12,1],0,"3",1,false]]}"""))
+        self.assertEqual((29.0, [], []), (board.game_state.enemy_health, game_map[14, 1], game_map[12, 1]), "Dead units should stay removed")
+        game_map.add_unit("PI", [20, 6], 0)
+        board.apply_frame(frame % (3, "29.0", """{"spawn":[],"move":[],"damage":[],"shield":[[[19,5],[20,6],3.0,1,"12","13",1]],"death":[]}"""))
+        self.assertEqual(18.0, game_map[20, 6][0].stability, "Shields should find units the board has not seen by their location")
+        prediction = board.predict_next_turn()
+        self.assertEqual((4, [], [], 1), (prediction.turn_number, prediction.game_map[14, 0], prediction.game_map[15, 1], len(board.game_state.game_map[14, 0])), "The prediction should drop information units and removed firewalls")
+        self.assertEqual((6.0, 1.0), (prediction.get_resource(state.CORES), board.game_state.get_resource(state.CORES)), "The prediction should gain cores")
+        self.assertEqual(1, len(state.game_map[14, 0]), "The turn's state should not change")
+
+    def test_action_simulator(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        game.suppress_warnings(True)
+        game.attempt_spawn("PI", [13, 0], 3)
+        result = game.simulate_action_phase()
+        self.assertEqual(([3, 0], 27.0, 28.0), (result.breaches, result.game_state.enemy_health, result.game_state.get_resource(game.CORES)), "Breaches should cost the enemy health and earn cores")
+        self.assertEqual((3, 0), (len(result.frames[0]["events"]["spawn"]), len(result.game_state.game_map[13, 0])), "Deployed units should spawn on frame 0 and leave the board")
+        board = LiveBoard(game)
+        for frame in result.frames:
+            board.apply_frame(frame)
+        self.assertEqual((27.0, {}), (board.game_state.enemy_health, board.game_state.game_map.mobile_units), "The frames should replay on a LiveBoard")
+
+        simulator = ActionSimulator(game._fork_parsed())
+        defense = [("DF", 24, 15), ("DF", 25, 15)]
+        result = simulator.run([], game._deploy_stack, defense)
+        self.assertEqual(([0, 0], [3, 0], 30.0), (result.breaches, result.units_lost, result.game_state.enemy_health), "Destructors should stop the pings")
+        quiet = simulator.run([], game._deploy_stack, defense, record=False)
+        self.assertEqual(([], result.damage_dealt), (quiet.frames, quiet.damage_dealt), "Recording frames should not change the outcome")
+        shielded = simulator.run([("EF", 19, 5)], game._deploy_stack, defense)
+        self.assertEqual(3, sum(len(frame["events"]["shield"]) for frame in shielded.frames), "Each encryptor should shield each unit once")
+        self.assertGreater(shielded.damage_dealt[1], result.damage_dealt[1], "Shields should take damage")
+
+        result = simulator.run([], [("PI", 13, 0, 2)], [("FF", x, 14) for x in range(28)])
+        self_destructs = [event for frame in result.frames for event in frame["events"]["selfDestruct"]]
+        self.assertEqual(([0, 0], [2, 0], 2), (result.breaches, result.units_lost, len(self_destructs)), "Blocked units should self destruct")
+        self.assertEqual(([[26, 14], [27, 14]], 15.0), (self_destructs[0][1], self_destructs[0][2]), "Self destructs should damage the enemy firewalls around them")
+
+    def random_deploy_stacks(self, game, seed, count):
+        rng = random.Random(seed)
+        spawns = game.game_map.get_edge_locations(game.game_map.BOTTOM_LEFT) + game.game_map.get_edge_locations(game.game_map.BOTTOM_RIGHT)
+        return [[(rng.choice(["PI", "EI", "SI"]),) + tuple(rng.choice(spawns)) + (rng.randint(1, 6),) for _ in range(rng.randint(1, 3))] for _ in range(count)]
+
+    def test_batch_simulator(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        game.suppress_warnings(True)
+        game.game_map.add_unit("DF", [24, 15], 1, 1000.0)
+        game.game_map.add_unit("DF", [25, 15], 1, 1000.0)
+        deploy_stacks = [[("PI", 13, 0, 3)], [("PI", 14, 0, 3)], [("PI", 13, 0, 3), ("PI", 14, 0, 2)], [("SI", 13, 0, 1)], []]
+        result = BatchSimulator(game).run(deploy_stacks)
+        self.assertEqual([0, 3, 2, 0, 0], result.breaches, "Only units pathing away from the destructors should score")
+        self.assertEqual([12.0, 0.0, 12.0, 0.0, 0.0], result.damage_dealt, "Each ping should hit a destructor until it dies, scramblers only hit information units")
+        self.assertEqual([3, 0, 3, 1, 0], result.units_lost, "Units pathing past the destructors should die")
+
+        for x in range(3, 25, 3):
+            game.game_map.add_unit("DF", [x, 15], 1, 20.0)
+            game.game_map.add_unit("FF", [x + 1, 15], 1, 10.0)
+        game.game_map.add_unit("EF", [14, 3], 0)
+        deploy_stacks = self.random_deploy_stacks(game, 4, 12)
+        result = BatchSimulator(game).run(deploy_stacks)
+        simulator = ActionSimulator(game)
+        for index, deploy_stack in enumerate(deploy_stacks):
+            expected = simulator.run(deploy_stack=deploy_stack, record=False)
+            self.assertEqual((expected.breaches[0], expected.damage_dealt[0], expected.units_lost[0]),
+                (result.breaches[index], result.damage_dealt[index], result.units_lost[index]), "Each scenario should play out like the ActionSimulator for {}".format(deploy_stack))
+
+    def test_estimate_survivors(self, adv=False):
+        game = self.make_turn_0_map(adv)
+        game.suppress_warnings(True)
+        self.assertEqual(4, game.estimate_survivors([13, 0], "PI", 4), "Every unit should survive an empty board")
+        self.assertEqual(0, game.estimate_survivors([13, 0], "XX", 4), "Unknown unit types should not survive")
+
+        #The path from [13, 0] spends 10 tiles in range of a destructor, so it takes 10 / speed shots of 4 damage
+        game.game_map.add_unit("DF", [24, 15], 1, 1000.0)
+        game.game_map.add_unit("DF", [25, 15], 1, 1000.0)
+        self.assertEqual(5, game.estimate_survivors([13, 0], "PI", 10), "20 shots should kill 5 pings of 15 stability")
+        self.assertEqual(0, game.estimate_survivors([13, 0], "PI", 3), "Fewer units than the shots can kill should not survive")
+        self.assertEqual(1, game.estimate_survivors([13, 0], "SI", 5), "40 shots should kill 4 scramblers of 40 stability")
+        self.assertEqual(3, game.estimate_survivors([14, 0], "PI", 3), "Units pathing away from the destructors should survive")
+        simulator = ActionSimulator(game)
+        for location, unit_type, num in [([13, 0], "PI", 10), ([13, 0], "SI", 5), ([14, 0], "PI", 3)]:
+            survivors = simulator.run(deploy_stack=[(unit_type, location[0], location[1], num)], record=False).breaches[0]
+            self.assertEqual(survivors, game.estimate_survivors(location, unit_type, num), "Estimates should match the ActionSimulator against destructors that do not fall")
+
+        fork = game.fork()
+        fork.game_map.add_unit("DF", [22, 14], 1)
+        self.assertLess(fork.estimate_survivors([13, 0], "PI", 10), game.estimate_survivors([13, 0], "PI", 10), "A new destructor on the path should kill more units")
+        for x in range(28):
+            fork.game_map.add_unit("FF", [x, 13], 0)
+        self.assertEqual(0, fork.estimate_survivors([13, 0], "PI", 3), "Units that cannot reach the edge should not survive")
+
+        close = 0
+        deploy_stacks = self.random_deploy_stacks(game, 5, 40)
+        for deploy_stack in deploy_stacks:
+            unit_type, x, y, num = deploy_stack[0]
+            estimate = game.estimate_survivors([x, y], unit_type, num)
+            survivors = simulator.run(deploy_stack=deploy_stack[:1], record=False).breaches[0]
+            self.assertTrue(0 <= estimate <= num, "Estimates should be between 0 and num")
+            close += abs(estimate - survivors) <= 1
+        self.assertGreaterEqual(close, 36, "Estimates should be calibrated against the ActionSimulator on a board whose destructors do not fall")
+
     def test_future_bits(self, adv=False):
         game = self.make_turn_0_map(adv)
 
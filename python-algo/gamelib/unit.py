@@ -1,9 +1,92 @@
+from collections import namedtuple
+
 def is_stationary(unit_type, firewall_types):
     return unit_type in firewall_types
 
+class UnitSpec(namedtuple("UnitSpec", ["index", "unit_type", "stationary", "cost", "range", "damage", "damage_f", "damage_i", "speed", "max_stability", "resource"])):
+    """The stats shared by every unit of one type, compiled from the config by compile_unit_specs
+
+    Attributes:
+        * index (int): The index of this type in the unitInformation of the config
+        * unit_type (string): The shorthand of this type
+        * stationary (bool): Whether or not this type is a firewall
+        * cost (int): The resource cost of this type
+        * range (float): The effective range of this type
+        * damage (float): The damage a firewall deals to enemy information, or the shield an encryptor gives. None for information
+        * damage_f (float): The damage an information unit deals to enemy firewalls. None for firewalls
+        * damage_i (float): The damage an information unit deals to enemy information. None for firewalls
+        * speed (float): A unit will move once every 1/speed frames, 0 for firewalls
+        * max_stability (float): The starting stability of this type
+        * resource (int): The resource this type costs, GameState.BITS or GameState.CORES
+
+    """
+    __slots__ = ()
+
+class UnitSpecs:
+    """The UnitSpec of every unit type in a config, see compile_unit_specs
+
+    Attributes:
+        * config (JSON): The config the specs were compiled from
+        * FILTER, ENCRYPTOR, DESTRUCTOR, PING, EMP, SCRAMBLER, REMOVE (str): The shorthand of each unit type
+        * FIREWALL_TYPES (tuple): The shorthands of the firewall types
+        * ALL_UNITS (tuple): The shorthands of every type that can be spawned
+        * unit_types (tuple): The shorthand of every type, REMOVE included, indexed like the unitInformation of the config
+        * type_index (dict): Maps the shorthand of every type, REMOVE included, to its index
+        * specs (tuple): The UnitSpec of every type that can be spawned, indexed like the unitInformation of the config
+        * by_type (dict): Maps the shorthand of every type that can be spawned to its UnitSpec
+
+    """
+    def __init__(self, config):
+        self.config = config
+        unit_information = config["unitInformation"]
+        self.unit_types = tuple(information.get("shorthand") for information in unit_information)
+        self.type_index = {unit_type: index for index, unit_type in enumerate(self.unit_types)}
+        self.FILTER, self.ENCRYPTOR, self.DESTRUCTOR, self.PING, self.EMP, self.SCRAMBLER, self.REMOVE = self.unit_types[:7]
+        self.FIREWALL_TYPES = (self.FILTER, self.ENCRYPTOR, self.DESTRUCTOR)
+        self.ALL_UNITS = (self.PING, self.EMP, self.SCRAMBLER, self.FILTER, self.ENCRYPTOR, self.DESTRUCTOR)
+
+        specs = []
+        for index, information in enumerate(unit_information[:6]):
+            unit_type = self.unit_types[index]
+            stationary = unit_type in self.FIREWALL_TYPES
+            if stationary:
+                damage = information["shieldAmount"] if unit_type == self.ENCRYPTOR else information["damage"]
+                specs.append(UnitSpec(index, unit_type, True, information["cost"], information["range"], damage,
+                    None, None, 0, information["stability"], 1))
+            else:
+                specs.append(UnitSpec(index, unit_type, False, information["cost"], information["range"], None,
+                    information["damageF"], information["damageI"], information["speed"], information["stability"], 0))
+        self.specs = tuple(specs)
+        self.by_type = {spec.unit_type: spec for spec in self.specs}
+
+_compiled_specs = {}
+
+def compile_unit_specs(config):
+    """Gets the UnitSpecs of a config, compiling them the first time the config is seen
+
+    The config is treated as immutable, so changing it after compiling will not change the specs.
+
+    Args:
+        * config (JSON): Contains information about the game
+
+    Returns:
+        The UnitSpecs of the config
+
+    """
+    compiled = _compiled_specs.get(id(config))
+    if compiled is None or compiled[0] is not config:
+        if len(_compiled_specs) >= 16:
+            _compiled_specs.clear()
+        compiled = (config, UnitSpecs(config))
+        _compiled_specs[id(config)] = compiled
+    return compiled[1]
+
 class GameUnit:
     """Holds information about a Unit. 
 
+    Units only store their own location, owner and health. The stats shared by every unit of a type are read
+    from its UnitSpec, so there is a single copy of them per config however many units are on the board.
+
     Attributes:
         * unit_type (string): This unit's type
         * config (JSON): Contains information about the game
@@ -21,36 +104,59 @@ class GameUnit:
         * cost (int): The resource cost of this unit
 
     """
+    __slots__ = ("_unit_specs", "_spec", "player_index", "stability", "pending_removal", "x", "y")
+
     def __init__(self, unit_type, config, player_index=None, stability=None, x=-1, y=-1):
         """ Initialize unit variables using args passed
 
         """
-        self.unit_type = unit_type
-        self.config = config
+        self._unit_specs = compile_unit_specs(config)
+        self._spec = self._unit_specs.by_type[unit_type]
         self.player_index = player_index
         self.pending_removal = False
         self.x = x
         self.y = y
-        self.__serialize_type()
-        self.stability = self.max_stability if not stability else stability
-
-    def __serialize_type(self):
-        from .game_state import FIREWALL_TYPES, UNIT_TYPE_TO_INDEX, ENCRYPTOR
-        self.stationary = is_stationary(self.unit_type, FIREWALL_TYPES)
-        type_config = self.config["unitInformation"][UNIT_TYPE_TO_INDEX[self.unit_type]]
-        if self.stationary:
-            self.speed = 0
-            if self.unit_type == ENCRYPTOR:
-                self.damage = type_config["shieldAmount"]
-            else:
-                self.damage = type_config["damage"]
-        else:
-            self.speed = type_config["speed"]
-            self.damage_f = type_config["damageF"]
-            self.damage_i = type_config["damageI"]
-        self.range = type_config["range"]
-        self.max_stability = type_config["stability"]
-        self.cost = type_config["cost"]
+        self.stability = self._spec.max_stability if not stability else stability
+
+    @property
+    def unit_type(self):
+        return self._spec.unit_type
+
+    @property
+    def config(self):
+        return self._unit_specs.config
+
+    @property
+    def stationary(self):
+        return self._spec.stationary
+
+    @property
+    def speed(self):
+        return self._spec.speed
+
+    @property
+    def damage(self):
+        return self._spec.damage
+
+    @property
+    def damage_f(self):
+        return self._spec.damage_f
+
+    @property
+    def damage_i(self):
+        return self._spec.damage_i
+
+    @property
+    def range(self):
+        return self._spec.range
+
+    @property
+    def max_stability(self):
+        return self._spec.max_stability
+
+    @property
+    def cost(self):
+        return self._spec.cost
 
     def __toString(self):
         owner = "Friendly" if self.player_index == 0 else "Enemy"
@@ -62,4 +168,3 @@ class GameUnit:
 
     def __repr__(self):
         return self.__toString()
-
@@ -1,4 +1,5 @@
 import sys
+import json
 
 
 BANNER_TEXT = "---------------- Starting Your Algo --------------------"
@@ -21,6 +22,38 @@ def get_command():
         exit()
     return ret
 
+class GameMessage(str):
+    """A message from the game together with its decoded json
+
+    It is still the message string, so code written for strings keeps working, while GameState
+    and load_state reuse the decoded json instead of parsing the message again.
+
+    Attributes:
+        * state (JSON): The decoded message
+
+    """
+    def __new__(cls, message, state):
+        self = super().__new__(cls, message)
+        self.state = state
+        return self
+
+def load_state(message):
+    """Decodes a message from the game, unless it has already been decoded
+
+    Args:
+        * message: A json string, a GameMessage or an already decoded dict
+
+    Returns:
+        The decoded message
+
+    """
+    if isinstance(message, dict):
+        return message
+    state = getattr(message, "state", None)
+    if state is None:
+        state = json.loads(message)
+    return state
+
 def send_command(cmd):
     """Sends your turn to standard output.
     Should usually only be called by 'GameState.submit_turn()'